@@ -2,9 +2,11 @@
 import os
 import json
 import pickle
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import re
 import unicodedata
+import threading
+from collections import OrderedDict
 
 import numpy as np
 import streamlit as st
@@ -24,16 +26,24 @@ try:
 except Exception:
     SentenceTransformer = None
 
+# Optional ONNX Runtime encoder (EMBED_BACKEND=onnx)
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction  # type: ignore
+    from transformers import AutoTokenizer  # type: ignore
+except Exception:
+    ORTModelForFeatureExtraction = None
+    AutoTokenizer = None
+
 # Deterministic extractors (dispatcher + specific modules)
 from extractors.kihon_happo import try_answer_kihon_happo
-from extractors import try_extract_answer
+from extractors import clear_dispatch_cache, try_extract_answer, warm_extractor_caches
 from extractors.leadership import try_extract_answer as try_leadership
 from extractors.weapons import try_answer_weapon_rank
 from extractors.rank import try_answer_rank_requirements
 from extractors.schools import (
     try_answer_school_profile,
     try_answer_schools_list,   # list extractor
-    SCHOOL_ALIASES,
+    SCHOOL_TERMS,
     is_school_list_query,
 )
 
@@ -125,14 +135,16 @@ def _load_index_and_meta() -> Tuple[Any, List[Dict[str, Any]]]:
     faiss_candidates.append(os.path.join(index_dir, "index.faiss"))  # what ingest.py writes
     faiss_candidates.append(os.path.join(index_dir, "faiss.index"))  # legacy name
 
+    # ---- Load meta once; every FAISS candidate is checked against the same list
+    with open(meta_path, "rb") as f:
+        chunks_local: List[Dict[str, Any]] = pickle.load(f)
+
     tried: list[str] = []
     def _try_load(fpath: str) -> Optional[Tuple[Any, List[Dict[str, Any]]]]:
         tried.append(fpath)
         if not (fpath and os.path.exists(fpath)):
             return None
         idx_local = faiss.read_index(fpath)
-        with open(meta_path, "rb") as f:
-            chunks_local: List[Dict[str, Any]] = pickle.load(f)
         # If obviously mismatched, signal caller to try next candidate
         ntotal_local = int(getattr(idx_local, "ntotal", 0) or 0)
         if ntotal_local <= 0 or len(chunks_local) <= 0:
@@ -172,35 +184,266 @@ def _load_index_and_meta() -> Tuple[Any, List[Dict[str, Any]]]:
     return idx, chunks
 
 
+# Text-side rerank cues. Chunk text is static, so each chunk's matches are
+# recorded once as a bitmask; retrieve() only tests bits per candidate.
+_WEAPON_TERMS = (
+    "hanbo","hanbō","rokushakubo","rokushaku","katana","tanto","shoto","shōtō",
+    "kusari","fundo","kusari fundo","kyoketsu","shoge","shōge","shuko","shukō",
+    "jutte","jitte","tessen","kunai","shuriken","senban","shaken",
+)
+_TECHNIQUE_TERMS = (
+    "omote gyaku","ura gyaku","musha dori","take ori","hon gyaku jime","oni kudaki",
+    "ude garame","ganseki otoshi","juji gatame","omoplata","te hodoki","tai hodoki",
+)
+_RANK_TERMS = (
+    "10th kyu","9th kyu","8th kyu","7th kyu","6th kyu","5th kyu","4th kyu","3rd kyu","2nd kyu","1st kyu",
+)
+
+_CUE_GROUPS: List[Tuple[str, ...]] = [
+    ("kihon happo",),
+    ("sanshin", "san shin"),
+    ("kyusho",),
+    ("boshi ken", "shito ken"),
+    _WEAPON_TERMS + ("[weapon]", "weapons reference"),
+    SCHOOL_TERMS,
+    ("[sokeship]", " soke", " sōke"),
+    _TECHNIQUE_TERMS,
+    (" kata", "no kata"),
+] + [(r,) for r in _RANK_TERMS]
+
+(CUE_KIHON, CUE_SANSHIN, CUE_KYUSHO, CUE_BOSHI, CUE_WEAPON,
+ CUE_SCHOOL, CUE_SOKE, CUE_TECH, CUE_KATA) = (1 << i for i in range(9))
+_RANK_CUE_BITS = tuple(1 << (9 + i) for i in range(len(_RANK_TERMS)))
+
+
+def _cue_bits(t_low: str) -> int:
+    bits = 0
+    for i, group in enumerate(_CUE_GROUPS):
+        if any(term in t_low for term in group):
+            bits |= 1 << i
+    return bits
+
+
+def _static_score(t_low: str, fname: str, prio: int, text_len: int) -> float:
+    """Query-independent part of the rerank score for one chunk."""
+    # ---- Priority boost from ingest (preferred), else filename heuristic
+    if prio:
+        priority_boost = {1: 0.0, 2: 0.20, 3: 0.40}.get(prio, 0.0)
+    elif "nttv rank requirements" in fname:
+        priority_boost = 0.40
+    elif "nttv training reference" in fname or "technique descriptions" in fname:
+        priority_boost = 0.20
+    else:
+        priority_boost = 0.0
+
+    # ---- Generic keyword nudges (small)
+    keyword_boost = 0.0
+    if "ryu" in t_low or "ryū" in t_low:
+        keyword_boost += 0.10
+    if "school" in t_low or "schools" in t_low:
+        keyword_boost += 0.05
+    if "bujinkan" in t_low:
+        keyword_boost += 0.05
+
+    lore_penalty = 0.0
+    if any(k in t_low for k in ["sarutobi", "sasuke", "leaping from tree", "legend", "folklore"]):
+        lore_penalty += 0.10
+
+    length_penalty = min(text_len / 2000.0, 0.3)
+
+    return priority_boost + keyword_boost - length_penalty - lore_penalty
+
+
+@st.cache_resource(show_spinner=False)
+def _load_chunk_views() -> Dict[str, Any]:
+    """
+    Struct-of-arrays view over CHUNKS, built once per index load so retrieve()
+    indexes into precomputed fields instead of re-lowercasing static text per query.
+    `src_index` maps lowered source path -> chunk indices (in chunk order).
+    `tech_lines` maps folded technique name -> (order, CSV line), see _index_tech_lines.
+    """
+    _, chunks = _load_index_and_meta()
+    text_low: List[str] = []
+    fname_low: List[str] = []
+    static = np.zeros(len(chunks), dtype="float64")
+    cues: List[int] = []
+    src_index: Dict[str, List[int]] = {}
+    for i, c in enumerate(chunks):
+        text = c.get("text", "")
+        meta = c.get("meta", {}) or {}
+        src_index.setdefault((meta.get("source") or "").lower(), []).append(i)
+        t_low = text.lower()
+        fname = os.path.basename(meta.get("source") or "").lower()
+        text_low.append(t_low)
+        fname_low.append(fname)
+        static[i] = _static_score(t_low, fname, int(meta.get("priority", 0)), len(text))
+        cues.append(_cue_bits(t_low))
+    return {
+        "text_low": text_low,
+        "fname_low": fname_low,
+        "static": static,
+        "cues": cues,
+        "src_index": src_index,
+        "tech_lines": _index_tech_lines(chunks, src_index),
+    }
+
+
 
 # --------------------------------------------------------------------
 # Embeddings
 # --------------------------------------------------------------------
-_EMBED_MODEL = None
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").strip().lower()
 
+
+class _OnnxEmbedder:
+    """
+    ONNX Runtime export of the sentence-transformers model with the same
+    `encode()` surface we use (mean pooling + optional L2 normalization), so
+    query vectors stay compatible with the index built by ingest.py.
+    """
+
+    def __init__(self, model_name: str, max_length: int = 256):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_name, export=True, provider="CPUExecutionProvider"
+        )
+        self.max_length = max_length
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = False, **_: Any) -> np.ndarray:
+        enc = self.tokenizer(
+            list(texts), padding=True, truncation=True,
+            max_length=self.max_length, return_tensors="np",
+        )
+        out = self.model(**enc).last_hidden_state
+        out = np.asarray(out, dtype="float32")
+        mask = enc["attention_mask"][..., None].astype("float32")
+        vecs = (out * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if normalize_embeddings:
+            vecs /= np.clip(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12, None)
+        return vecs
+
+
+# cache_resource rather than a module global: Streamlit reruns reset globals,
+# which would reload the model weights on every interaction.
+@st.cache_resource(show_spinner=False)
 def get_embedder():
-    global _EMBED_MODEL
     # Guarantee config/index has been loaded at least once so EMBED_MODEL_NAME is correct
     _load_index_and_meta()
 
-    if _EMBED_MODEL is None:
-        if SentenceTransformer is None:
+    if EMBED_BACKEND == "onnx":
+        if ORTModelForFeatureExtraction is None or AutoTokenizer is None:
             raise RuntimeError(
-                "sentence-transformers is not installed. "
-                "Add `sentence-transformers` to requirements.txt."
+                "EMBED_BACKEND=onnx but optimum[onnxruntime] is not installed. "
+                "Install `optimum[onnxruntime]` or unset EMBED_BACKEND."
             )
-        _EMBED_MODEL = SentenceTransformer(EMBED_MODEL_NAME)
-    return _EMBED_MODEL
+        return _OnnxEmbedder(EMBED_MODEL_NAME)
+    if SentenceTransformer is None:
+        raise RuntimeError(
+            "sentence-transformers is not installed. "
+            "Add `sentence-transformers` to requirements.txt."
+        )
+    return SentenceTransformer(EMBED_MODEL_NAME)
 
-def embed_query(q: str) -> np.ndarray:
+# st.cache_data (not functools.lru_cache): Streamlit re-executes this script on
+# every rerun, so a module-level LRU would be thrown away on each interaction.
+@st.cache_data(show_spinner=False, max_entries=1024)
+def _embed_query_cached(q: str) -> np.ndarray:
     model = get_embedder()
-    v = model.encode([q], normalize_embeddings=True)
-    return v.astype("float32")
+    v = model.encode([q], normalize_embeddings=True, convert_to_numpy=True)
+    if v.dtype != np.float32:
+        v = v.astype(np.float32, copy=False)
+    return np.ascontiguousarray(v)
+
+
+def embed_query(q: str) -> np.ndarray:
+    """Embed a single query; repeated queries skip the encoder forward pass."""
+    return _embed_query_cached(q)
 
 
 # --------------------------------------------------------------------
 # Retrieval & reranking
 # --------------------------------------------------------------------
+# A rerank rule fires for a chunk when its cue bits hit `mask` or its file name
+# contains one of `fname_terms`; firing adds `weight` (negative = penalty).
+RerankRule = Tuple[int, Tuple[str, ...], float]
+
+
+def _alternation(terms) -> "re.Pattern[str]":
+    """One compiled pattern equivalent to any(t in s for t in terms)."""
+    return re.compile("|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True)))
+
+
+# Query-side term groups: one regex sweep over the question instead of a Python
+# substring test per term.
+_WEAPON_QUERY_RX = _alternation(_WEAPON_TERMS + ("weapon", "what rank", "introduced at", "when do i learn"))
+_SCHOOL_QUERY_RX = _alternation(SCHOOL_TERMS)
+_TECH_QUERY_RX = _alternation(_TECHNIQUE_TERMS)
+_RANK_QUERY_RX = _alternation(_RANK_TERMS)
+_RANK_BIT_BY_TERM = dict(zip(_RANK_TERMS, _RANK_CUE_BITS))
+
+
+def _rerank_rules(q_low: str) -> List[RerankRule]:
+    """
+    Specialize the reranker for one query: evaluate every query-side test once
+    and keep only the rules that can fire, so the per-candidate loop skips the
+    branches this query never activates.
+    """
+    rules: List[RerankRule] = []
+
+    ask_kihon = "kihon happo" in q_low
+    ask_sanshin = ("sanshin" in q_low) or ("san shin" in q_low)
+    ask_kyusho = "kyusho" in q_low
+    ask_weapon = _WEAPON_QUERY_RX.search(q_low) is not None
+
+    # Core concepts (STRONG)
+    if ask_kihon:
+        rules.append((CUE_KIHON, (), 0.60))
+    if ask_sanshin:
+        rules.append((CUE_SANSHIN, (), 0.45))
+    if ask_kyusho:
+        rules.append((CUE_KYUSHO, (), 0.25))
+
+    # Boshi/Shito names
+    if ("boshi ken" in q_low) or ("shito ken" in q_low):
+        rules.append((CUE_BOSHI, (), 0.45))
+
+    # Weapons cues + filename heuristic (Weapons Reference / Glossary)
+    if ask_weapon:
+        rules.append((CUE_WEAPON, (), 0.55))
+        rules.append((0, ("weapons reference", "glossary"), 0.25))
+
+    # Schools / ryū boost
+    if _SCHOOL_QUERY_RX.search(q_low):
+        rules.append((CUE_SCHOOL, (), 0.45))
+
+    # Leadership boost (extra when the chunk is from the leadership file)
+    if _LEADERSHIP_Q_RX.search(q_low):
+        rules.append((CUE_SOKE, ("leadership",), 0.60))
+        rules.append((0, ("leadership",), 0.20))
+
+    # Technique name nudge (from Technique Descriptions)
+    if _TECH_QUERY_RX.search(q_low) or ("what is" in q_low and len(q_low.split()) <= 6):
+        rules.append((CUE_TECH, ("technique descriptions",), 0.55))
+
+    # Kata boost
+    if (" kata" in q_low) or ("no kata" in q_low) or (" kata?" in q_low):
+        rules.append((CUE_KATA, (), 0.50))
+
+    # Offtopic penalties
+    if ask_kihon:
+        rules.append((CUE_KYUSHO, (), -0.15))
+    if ask_kyusho:
+        rules.append((CUE_KIHON, (), -0.15))
+    if ask_sanshin:
+        rules.append((CUE_KYUSHO, (), -0.12))
+
+    # Exact rank match
+    for rank in set(_RANK_QUERY_RX.findall(q_low)):
+        rules.append((_RANK_BIT_BY_TERM[rank], (), 0.50))
+
+    return rules
+
+
 def retrieve(q: str, k: int | None = None) -> List[Dict[str, Any]]:
     """
     Search FAISS, then rerank with filename priority, query-aware boosts/penalties, and rank match.
@@ -230,8 +473,13 @@ def retrieve(q: str, k: int | None = None) -> List[Dict[str, Any]]:
     want = min(max(k * 2, k), ntotal)
     D, I = idx.search(v, want)
 
-    cand = []
+    views = _load_chunk_views()
+    fname_low, static, cues = views["fname_low"], views["static"], views["cues"]
+
     q_low = q.lower()
+    rules = _rerank_rules(q_low)
+
+    cand = []
 
     for idx_i, score in zip(I[0], D[0]):
         # FAISS may return -1 for empty slots; also guard out-of-range indices
@@ -241,135 +489,16 @@ def retrieve(q: str, k: int | None = None) -> List[Dict[str, Any]]:
         c = chunks[idx_i]
         text = c.get("text", "")
         meta = c.get("meta", {}) or {}
-        t_low = text.lower()
+        bits = cues[idx_i]
+        fname = fname_low[idx_i]
 
-        # ---- Priority boost from ingest (preferred), else filename heuristic
-        prio = int(meta.get("priority", 0))
-        if prio:
-            priority_boost = {1: 0.0, 2: 0.20, 3: 0.40}.get(prio, 0.0)
-        else:
-            fname_heur = os.path.basename(meta.get("source", "")).lower()
-            if "nttv rank requirements" in fname_heur:
-                priority_boost = 0.40
-            elif "nttv training reference" in fname_heur or "technique descriptions" in fname_heur:
-                priority_boost = 0.20
-            else:
-                priority_boost = 0.0
-
-        # ---- Generic keyword nudges (small)
-        keyword_boost = 0.0
-        if "ryu" in t_low or "ryū" in t_low:
-            keyword_boost += 0.10
-        if "school" in t_low or "schools" in t_low:
-            keyword_boost += 0.05
-        if "bujinkan" in t_low:
-            keyword_boost += 0.05
-
-        # ---- Query-aware boosts/penalties (STRONG for core concepts)
-        qt_boost = 0.0
-
-        # Kihon Happo
-        if "kihon happo" in q_low and "kihon happo" in t_low:
-            qt_boost += 0.60
-
-        # Sanshin
-        ask_sanshin = ("sanshin" in q_low) or ("san shin" in q_low)
-        has_sanshin = ("sanshin" in t_low) or ("san shin" in t_low) or ("sanshin no kata" in t_low)
-        if ask_sanshin and has_sanshin:
-            qt_boost += 0.45
-
-        # Kyusho
-        if "kyusho" in q_low and "kyusho" in t_low:
-            qt_boost += 0.25
-
-        # Boshi/Shito names
-        ask_boshi = ("boshi ken" in q_low) or ("shito ken" in q_low)
-        has_boshi = ("boshi ken" in t_low) or ("shito ken" in t_low)
-        if ask_boshi and has_boshi:
-            qt_boost += 0.45
-
-        # Weapons cues
-        weapon_terms = [
-            "hanbo","hanbō","rokushakubo","rokushaku","katana","tanto","shoto","shōtō",
-            "kusari","fundo","kusari fundo","kyoketsu","shoge","shōge","shuko","shukō",
-            "jutte","jitte","tessen","kunai","shuriken","senban","shaken"
-        ]
-        ask_weapon = (
-            any(w in q_low for w in weapon_terms)
-            or ("weapon" in q_low) or ("weapons" in q_low)
-            or ("what rank" in q_low) or ("introduced at" in q_low)
-            or ("when do i learn" in q_low)
-        )
-        has_weaponish = any(w in t_low for w in weapon_terms) or ("[weapon]" in t_low) or ("weapons reference" in t_low)
-        if ask_weapon and has_weaponish:
-            qt_boost += 0.55
+        # ---- Query-aware boosts/penalties: only the rules this query activated
+        boost = 0.0
+        for mask, fname_terms, weight in rules:
+            if bits & mask or any(t in fname for t in fname_terms):
+                boost += weight
 
-        # Filename heuristic: prefer Weapons Reference / Glossary for weapons Qs
-        fname = os.path.basename(meta.get("source") or "").lower()
-        if ask_weapon and ("weapons reference" in fname or "glossary" in fname):
-            qt_boost += 0.25
-
-        # Schools / ryū boost
-        school_aliases = []
-        for canon, aliases in SCHOOL_ALIASES.items():
-            school_aliases.extend([canon.lower()] + [a.lower() for a in aliases])
-        if any(a in q_low for a in school_aliases) and any(a in t_low for a in school_aliases):
-            qt_boost += 0.45
-
-        # Leadership boost
-        ask_soke = any(t in q_low for t in ["soke","sōke","grandmaster","headmaster","current head","current grandmaster"])
-        has_soke = ("[sokeship]" in t_low) or (" soke" in t_low) or (" sōke" in t_low)
-        if ask_soke and (has_soke or "leadership" in fname):
-            qt_boost += 0.60
-            if "leadership" in fname:
-                qt_boost += 0.20
-
-        # Technique name nudge (from Technique Descriptions)
-        technique_terms = [
-            "omote gyaku","ura gyaku","musha dori","take ori","hon gyaku jime","oni kudaki",
-            "ude garame","ganseki otoshi","juji gatame","omoplata","te hodoki","tai hodoki",
-        ]
-        ask_tech = any(t in q_low for t in technique_terms) or ("what is" in q_low and len(q_low.split()) <= 6)
-        has_tech = any(t in t_low for t in technique_terms) or ("technique descriptions" in fname)
-        if ask_tech and has_tech:
-            qt_boost += 0.55
-
-        # Kata boost
-        kata_boost = 0.0
-        ask_kata = (" kata" in q_low) or ("no kata" in q_low) or (" kata?" in q_low)
-        has_kata = (" kata" in t_low) or ("no kata" in t_low)
-        if ask_kata and has_kata:
-            kata_boost += 0.50
-
-        # Offtopic penalties / lore / length
-        offtopic_penalty = 0.0
-        if "kihon happo" in q_low and "kyusho" in t_low: offtopic_penalty += 0.15
-        if "kyusho" in q_low and "kihon happo" in t_low: offtopic_penalty += 0.15
-        if ask_sanshin and "kyusho" in t_low: offtopic_penalty += 0.12
-
-        lore_penalty = 0.0
-        if any(k in t_low for k in ["sarutobi", "sasuke", "leaping from tree", "legend", "folklore"]):
-            lore_penalty += 0.10
-
-        length_penalty = min(len(text) / 2000.0, 0.3)
-
-        # Exact rank match
-        rank_boost = 0.0
-        for rank in ["10th kyu","9th kyu","8th kyu","7th kyu","6th kyu","5th kyu","4th kyu","3rd kyu","2nd kyu","1st kyu"]:
-            if rank in q_low and rank in t_low:
-                rank_boost += 0.50
-
-        new_score = (
-            float(score)
-            + priority_boost
-            + keyword_boost
-            + qt_boost
-            + rank_boost
-            + kata_boost
-            - length_penalty
-            - offtopic_penalty
-            - lore_penalty
-        )
+        new_score = float(score) + float(static[idx_i]) + boost
 
         cand.append(
             (
@@ -402,6 +531,10 @@ def build_context(snippets: List[Dict[str, Any]], max_chars: int = 6000) -> str:
     """Concatenate top-k snippets into a context block with a cap."""
     lines, total = [], 0
     for i, s in enumerate(snippets, 1):
+        # Lower bound on the block size (text + separators): if even that overflows,
+        # stop before formatting a large block we would throw away.
+        if total + len(s["text"]) + 7 > max_chars:
+            break
         tag = f"[{i}] {os.path.basename(s['source'])}"
         if s.get("page"):
             tag += f" (p. {s['page']})"
@@ -421,104 +554,95 @@ def retrieval_quality(hits: List[Dict[str, Any]]) -> float:
 # --------------------------------------------------------------------
 # Injectors & helpers
 # --------------------------------------------------------------------
+# Pure over the loaded index, and callers only ever ask for a handful of
+# canonical sources: cache the id lists (the Kihon scan uses them directly)...
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _chunk_ids_for_source(name_contains: str) -> List[int]:
+    """Chunk indices whose source path contains `name_contains` (case-insensitive), in chunk order."""
+    name_low = (name_contains or "").lower()
+    src_index = _load_chunk_views()["src_index"]
+    ids: List[int] = []
+    for src_low, src_ids in src_index.items():
+        if name_low in src_low:
+            ids.extend(src_ids)
+    ids.sort()
+    return ids
+
+
+# ...and the joined full text the injectors put on top, so the join runs once
+# per source, not on every injected question. cache_resource (no copy on hit)
+# survives reruns and hands back the same str object each time.
+@st.cache_resource(show_spinner=False, max_entries=32)
 def _gather_full_text_for_source(name_contains: str) -> Tuple[str, Optional[str]]:
     _, chunks = _load_index_and_meta()
-    name_low = (name_contains or "").lower()
-    parts, path = [], None
-    for c in chunks:
-        src = (c["meta"].get("source") or "")
-        if name_low in src.lower():
-            parts.append(c["text"])
-            path = src
+    ids = _chunk_ids_for_source(name_contains)
+    parts = [chunks[i]["text"] for i in ids]
+    path = (chunks[ids[-1]]["meta"].get("source") or "") if ids else None
     return ("\n\n".join(parts), path)
 
 
-def inject_rank_passage_if_needed(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    ql = question.lower()
-    if not any(t in ql for t in ["kyu", "shodan", "rank requirement", "rank requirements"]):
-        return hits
-    txt, path = _gather_full_text_for_source("nttv rank requirements")
+def _synthetic_source_passage(name_contains: str, fallback: str, rerank_score: float) -> Optional[Dict[str, Any]]:
+    """Full text of one source as a synthetic top passage, or None if the source is absent."""
+    txt, path = _gather_full_text_for_source(name_contains)
     if not txt:
-        return hits
-    synth = {
+        return None
+    return {
         "text": txt,
-        "meta": {"priority": 1, "source": path or "nttv rank requirements.txt (synthetic)"},
-        "source": path or "nttv rank requirements.txt (synthetic)",
+        "meta": {"priority": 1, "source": path or fallback},
+        "source": path or fallback,
         "page": None,
         "score": 1.0,
-        "rerank_score": 997.0,
+        "rerank_score": rerank_score,
     }
-    return [synth] + hits
 
 
-def inject_leadership_passage_if_needed(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    ql = question.lower()
-    if not any(t in ql for t in ["soke","sōke","grandmaster","headmaster","current head","current grandmaster"]):
-        return hits
-    txt, path = _gather_full_text_for_source("bujinkan leadership and wisdom")
-    if not txt:
-        return hits
-    synth = {
-        "text": txt,
-        "meta": {"priority": 1, "source": path or "Bujinkan Leadership and Wisdom.txt (synthetic)"},
-        "source": path or "Bujinkan Leadership and Wisdom.txt (synthetic)",
-        "page": None,
-        "score": 1.0,
-        "rerank_score": 998.0,
-    }
-    return [synth] + hits
+_RANK_TRIGGERS = ("kyu", "shodan", "rank requirement", "rank requirements")
+_LEADERSHIP_TRIGGERS = ("soke","sōke","grandmaster","headmaster","current head","current grandmaster")
+_LEADERSHIP_Q_RX = _alternation(_LEADERSHIP_TRIGGERS)  # shared by injector, reranker and dispatch
+_SCHOOLS_TRIGGERS = ("school", "schools", "ryu", "ryū", "bujinkan")
+_WEAPONS_TRIGGERS = (
+    "hanbo","hanbō","rokushakubo","rokushaku","katana","tanto","shoto","shōtō",
+    "kusari","fundo","kusari fundo","kyoketsu","shoge","shōge","shuko","shukō",
+    "jutte","jitte","tessen","kunai","shuriken","senban","shaken","throwing star","throwing spike",
+    "weapon","weapons","what rank","when do i learn","introduced at"
+)
+_KIHON_TRIGGERS = ("kihon happo", "kihon happō")
 
 
-def inject_schools_passage_if_needed(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    ql = question.lower()
-    if not any(t in ql for t in ["school", "schools", "ryu", "ryū", "bujinkan"]):
-        return hits
-    txt, path = _gather_full_text_for_source("schools of the bujinkan summaries")
-    if not txt:
-        return hits
-    synth = {
-        "text": txt,
-        "meta": {"priority": 1, "source": path or "Schools of the Bujinkan Summaries.txt (synthetic)"},
-        "source": path or "Schools of the Bujinkan Summaries.txt (synthetic)",
-        "page": None,
-        "score": 1.0,
-        "rerank_score": 995.0,
-    }
-    return [synth] + hits
+def _rank_passage(ql: str) -> Optional[Dict[str, Any]]:
+    if not any(t in ql for t in _RANK_TRIGGERS):
+        return None
+    return _synthetic_source_passage("nttv rank requirements", "nttv rank requirements.txt (synthetic)", 997.0)
 
 
-def inject_weapons_passage_if_needed(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Prepend the full NTTV Weapons Reference when the question mentions a weapon or 'rank/learn' for weapons."""
-    ql = question.lower()
-    weapon_triggers = [
-        "hanbo","hanbō","rokushakubo","rokushaku","katana","tanto","shoto","shōtō",
-        "kusari","fundo","kusari fundo","kyoketsu","shoge","shōge","shuko","shukō",
-        "jutte","jitte","tessen","kunai","shuriken","senban","shaken","throwing star","throwing spike",
-        "weapon","weapons","what rank","when do i learn","introduced at"
-    ]
-    if not any(t in ql for t in weapon_triggers):
-        return hits
-    txt, path = _gather_full_text_for_source("weapons reference")
-    if not txt:
-        return hits
-    synth = {
-        "text": txt,
-        "meta": {"priority": 1, "source": path or "NTTV Weapons Reference.txt (synthetic)"},
-        "source": path or "NTTV Weapons Reference.txt (synthetic)",
-        "page": None,
-        "score": 1.0,
-        "rerank_score": 996.0,
-    }
-    return [synth] + hits
+def _leadership_passage(ql: str) -> Optional[Dict[str, Any]]:
+    if not _LEADERSHIP_Q_RX.search(ql):
+        return None
+    return _synthetic_source_passage(
+        "bujinkan leadership and wisdom", "Bujinkan Leadership and Wisdom.txt (synthetic)", 998.0
+    )
+
+
+def _schools_passage(ql: str) -> Optional[Dict[str, Any]]:
+    if not any(t in ql for t in _SCHOOLS_TRIGGERS):
+        return None
+    return _synthetic_source_passage(
+        "schools of the bujinkan summaries", "Schools of the Bujinkan Summaries.txt (synthetic)", 995.0
+    )
+
 
+def _weapons_passage(ql: str) -> Optional[Dict[str, Any]]:
+    """The full NTTV Weapons Reference when the question mentions a weapon or 'rank/learn' for weapons."""
+    if not any(t in ql for t in _WEAPONS_TRIGGERS):
+        return None
+    return _synthetic_source_passage("weapons reference", "NTTV Weapons Reference.txt (synthetic)", 996.0)
 
-def inject_techniques_passage_if_needed(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Prepend the full Technique Descriptions when a technique-style question is asked (but NOT for concepts)."""
-    ql = question.lower()
 
+def _techniques_passage(ql: str) -> Optional[Dict[str, Any]]:
+    """The full Technique Descriptions for a technique-style question (but NOT for concepts)."""
     # 🚫 Do NOT inject techniques for concept queries (these have their own extractors)
     if any(b in ql for b in ["kihon happo", "sanshin", "school", "schools", "ryu", "ryū"]):
-        return hits
+        return None
 
     triggers = [
         "what is", "define", "explain",
@@ -528,29 +652,18 @@ def inject_techniques_passage_if_needed(question: str, hits: List[Dict[str, Any]
         " no kata",
     ]
     if not any(t in ql for t in triggers):
-        return hits
+        return None
+    return _synthetic_source_passage("technique descriptions", "Technique Descriptions.md (synthetic)", 994.0)
 
-    txt, path = _gather_full_text_for_source("technique descriptions")
-    if not txt:
-        return hits
 
-    synth = {
-        "text": txt,
-        "meta": {"priority": 1, "source": path or "Technique Descriptions.md (synthetic)"},
-        "source": path or "Technique Descriptions.md (synthetic)",
-        "page": None,
-        "score": 1.0,
-        "rerank_score": 994.0,
-    }
-    return [synth] + hits
+_KIHON_SCAN_SOURCES = ("training reference", "rank requirements", "schools", "glossary", "technique descriptions")
 
 
-def inject_kihon_passage_if_needed(question: str, hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _kihon_passage(ql: str, hits: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """If the question is about Kihon Happo, synthesize a concise passage with the two subsets + items."""
+    if not any(t in ql for t in _KIHON_TRIGGERS):
+        return None
     _, chunks = _load_index_and_meta()
-    ql = question.lower()
-    if "kihon happo" not in ql and "kihon happō" not in ql:
-        return hits
 
     kosshi_lines, torite_lines, defs = [], [], []
 
@@ -564,11 +677,11 @@ def inject_kihon_passage_if_needed(question: str, hits: List[Dict[str, Any]]) ->
                 defs.append(ln.rstrip(" ;,"))
             if "kosshi" in low and "sanpo" in low:
                 tail = ln.split(":", 1)[1].strip() if ":" in ln else ln
-                parts = [p.strip(" -•\t") for p in re.split(r"[;,]", tail) if 2 <= len(p.strip()) <= 60]
+                parts = [p.strip(" -•\t") for p in tail.replace(";", ",").split(",") if 2 <= len(p.strip()) <= 60]
                 kosshi_lines.extend(parts)
             if "torite" in low and ("goho" in low or "gohō" in low):
                 tail = ln.split(":", 1)[1].strip() if ":" in ln else ln
-                parts = [p.strip(" -•\t") for p in re.split(r"[;,]", tail) if 2 <= len(p.strip()) <= 60]
+                parts = [p.strip(" -•\t") for p in tail.replace(";", ",").split(",") if 2 <= len(p.strip()) <= 60]
                 torite_lines.extend(parts)
 
     # scan top-N retrieved first, then a light scan across chunks if needed
@@ -576,11 +689,11 @@ def inject_kihon_passage_if_needed(question: str, hits: List[Dict[str, Any]]) ->
         push_lines_from(p.get("text", ""))
 
     if (len(kosshi_lines) < 3 or len(torite_lines) < 5):
-        for c in chunks[:1000]:  # bounded scan
-            src = (c["meta"].get("source") or "").lower()
-            if not any(tag in src for tag in ["training reference", "rank requirements", "schools", "glossary", "technique descriptions"]):
-                continue
-            push_lines_from(c["text"])
+        ids = sorted({i for tag in _KIHON_SCAN_SOURCES for i in _chunk_ids_for_source(tag)})
+        for i in ids:
+            if i >= 1000:  # bounded scan
+                break
+            push_lines_from(chunks[i]["text"])
             if len(kosshi_lines) >= 3 and len(torite_lines) >= 5 and defs:
                 break
 
@@ -595,7 +708,7 @@ def inject_kihon_passage_if_needed(question: str, hits: List[Dict[str, Any]]) ->
     torite = dedupe(torite_lines)[:5]
 
     if not (kosshi or torite or defs):
-        return hits
+        return None
 
     parts = ["Kihon Happo consists of Kosshi Kihon Sanpo and Torite Goho."]
     if kosshi:
@@ -607,7 +720,7 @@ def inject_kihon_passage_if_needed(question: str, hits: List[Dict[str, Any]]) ->
 
     body = " ".join(parts).strip()
 
-    synth = {
+    return {
         "text": body,
         "meta": {"priority": 1, "source": "Kihon Happo (synthetic)"},
         "source": "Kihon Happo (synthetic)",
@@ -615,7 +728,6 @@ def inject_kihon_passage_if_needed(question: str, hits: List[Dict[str, Any]]) ->
         "score": 1.0,
         "rerank_score": 998.0,
     }
-    return [synth] + hits
 
 
 # --------------------------------------------------------------------
@@ -759,6 +871,10 @@ def _fold(s: str) -> str:
     return s.lower().strip()
 
 
+_SINGLE_TECH_ASK_RX = _re2.compile(r"(?:what\s+is|define|explain)\s+(.+)$", _re2.I)
+_SINGLE_TECH_FILLER_RX = _re2.compile(r"\b(technique|in ninjutsu|in bujinkan)\b", _re2.I)
+
+
 def _is_single_technique_query(q: str) -> Optional[str]:
     """
     Return a candidate technique name if the query looks like a single technique ask,
@@ -768,9 +884,9 @@ def _is_single_technique_query(q: str) -> Optional[str]:
     for ban in ("kihon happo", "kihon happō", "sanshin", "school", "schools", "ryu", "ryū"):
         if ban in ql:
             return None
-    m = _re2.search(r"(?:what\s+is|define|explain)\s+(.+)$", q, flags=_re2.I)
+    m = _SINGLE_TECH_ASK_RX.search(q)
     cand = (m.group(1) if m else q).strip().rstrip("?!.")
-    cand = _re2.sub(r"\b(technique|in ninjutsu|in bujinkan)\b", "", cand, flags=_re2.I).strip()
+    cand = _SINGLE_TECH_FILLER_RX.sub("", cand).strip()
     return cand if 2 <= len(cand) <= 80 else None
 
 
@@ -796,26 +912,49 @@ def _tech_name_variants(name: str) -> list[str]:
     return out
 
 
-def _find_tech_line_in_chunks(name_variants: list[str]) -> Optional[str]:
+def _index_tech_lines(
+    chunks: List[Dict[str, Any]], src_index: Dict[str, List[int]]
+) -> Dict[str, Tuple[int, str]]:
     """
-    Scan all CHUNKS for lines from Technique Descriptions.md whose first CSV cell
-    (technique name) matches any variant (macron-insensitive).
-    Return the full CSV line if found.
+    Fold the first CSV cell (technique name) of every Technique Descriptions.md
+    line once per index load. Values keep the line's position so lookups can
+    still return the earliest match when several variants hit.
     """
-    _, chunks = _load_index_and_meta()
-    folded_targets = {_fold(v) for v in name_variants}
-    for c in chunks:
-        src = (c["meta"].get("source") or "").lower()
-        if "technique descriptions.md" not in src:
-            continue
-        for raw in c["text"].splitlines():
+    out: Dict[str, Tuple[int, str]] = {}
+    pos = 0
+    ids = sorted(i for src, ids in src_index.items() if "technique descriptions.md" in src for i in ids)
+    for i in ids:
+        for raw in chunks[i]["text"].splitlines():
             line = raw.strip()
             if not line or "," not in line:
                 continue
             first = line.split(",", 1)[0].strip()
-            if _fold(first) in folded_targets:
-                return line
-    return None
+            out.setdefault(_fold(first), (pos, line))
+            pos += 1
+    return out
+
+
+def _find_tech_line_in_chunks(name_variants: list[str]) -> Optional[str]:
+    """
+    Look up the Technique Descriptions.md line whose first CSV cell
+    (technique name) matches any variant (macron-insensitive).
+    Return the full CSV line if found.
+    """
+    tech_lines = _load_chunk_views()["tech_lines"]
+    hits = [tech_lines[f] for f in {_fold(v) for v in name_variants} if f in tech_lines]
+    return min(hits)[1] if hits else None
+
+
+def _technique_line_passage(line: str) -> Dict[str, Any]:
+    """The synthetic passage carrying one Technique Descriptions CSV line."""
+    return {
+        "text": line,
+        "meta": {"source": "Technique Descriptions (synthetic line)", "priority": 1},
+        "source": "Technique Descriptions (synthetic line)",
+        "page": None,
+        "score": 1.0,
+        "rerank_score": 1.0,
+    }
 
 
 def inject_specific_technique_line_if_needed(question: str, passages: list[dict]) -> list[dict]:
@@ -828,14 +967,7 @@ def inject_specific_technique_line_if_needed(question: str, passages: list[dict]
     if not line:
         return passages
 
-    synth = {
-        "text": line,
-        "meta": {"source": "Technique Descriptions (synthetic line)", "priority": 1},
-        "source": "Technique Descriptions (synthetic line)",
-        "page": None,
-        "score": 1.0,
-        "rerank_score": 1.0,
-    }
+    synth = _technique_line_passage(line)
     if not passages or passages[0].get("text") != line:
         return [synth] + passages
     return passages
@@ -844,11 +976,34 @@ def inject_specific_technique_line_if_needed(question: str, passages: list[dict]
 # --------------------------------------------------------------------
 # LLM backend (fallback)
 # --------------------------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def _http_session():
+    """
+    One keep-alive connection pool shared by every session's LLM calls, so
+    concurrent users reuse warm TCP/TLS connections instead of handshaking per
+    question. requests does not document Session as thread-safe; sharing it
+    relies on our calls being stateless POSTs (no cookies, auth or settings
+    changed after setup) over urllib3's thread-safe connection pool.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    sess = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+
 def call_llm(
     prompt: str,
-    system: str = "You are a precise assistant. Use only the provided context."
+    system: str = "You are a precise assistant. Use only the provided context.",
+    on_delta: Optional[Callable[[str], None]] = None,
 ) -> Tuple[str, str]:
-    import requests
+    """
+    Chat completion against the configured OpenAI-compatible endpoint.
+    With `on_delta`, the response is streamed and `on_delta(text_so_far)` is
+    called as tokens arrive; the return value is the same either way.
+    """
     model = os.environ.get("MODEL", "gpt-4o-mini")
     api_key = os.environ.get("OPENAI_API_KEY") or os.environ.get("OPENROUTER_API_KEY")
     base = (
@@ -873,8 +1028,11 @@ def call_llm(
         "max_tokens": 600,
     }
 
+    if on_delta is not None:
+        return _call_llm_stream(base, headers, body, on_delta)
+
     try:
-        r = requests.post(f"{base}/chat/completions", headers=headers, json=body, timeout=30)
+        r = _http_session().post(f"{base}/chat/completions", headers=headers, json=body, timeout=30)
         r.raise_for_status()
         data = r.json()
         text = (data.get("choices") or [{}])[0].get("message", {}).get("content", "") or ""
@@ -883,17 +1041,64 @@ def call_llm(
         return "", json.dumps({"error": type(e).__name__, "detail": str(e)})[:4000]
 
 
+def _call_llm_stream(
+    base: str, headers: Dict[str, str], body: Dict[str, Any], on_delta: Callable[[str], None]
+) -> Tuple[str, str]:
+    """Server-sent-events variant of call_llm; accumulates deltas into the full text."""
+    parts: List[str] = []
+    last: Dict[str, Any] = {}
+    try:
+        with _http_session().post(
+            f"{base}/chat/completions", headers=headers, json={**body, "stream": True},
+            timeout=30, stream=True,
+        ) as r:
+            r.raise_for_status()
+            # SSE is always UTF-8; without a charset requests would guess
+            # ISO-8859-1 (mangling macrons) or yield bytes.
+            r.encoding = "utf-8"
+            for line in r.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
+                last = json.loads(payload)
+                delta = ((last.get("choices") or [{}])[0].get("delta") or {}).get("content") or ""
+                if delta:
+                    parts.append(delta)
+                    on_delta("".join(parts))
+    except Exception as e:
+        if not parts:
+            return "", json.dumps({"error": type(e).__name__, "detail": str(e)})[:4000]
+        # Cut off mid-stream: keep what arrived, but mark it with the "❌"
+        # failure marker so answer_with_rag does not cache a truncated answer.
+        text = "".join(parts) + f"\n\n❌ Response was cut off ({type(e).__name__})."
+        raw = {
+            "stream": True, "id": last.get("id"), "model": last.get("model"), "content": text,
+            "partial": True, "error": type(e).__name__, "detail": str(e),
+        }
+        return text, json.dumps(raw)[:4000]
+    text = "".join(parts)
+    raw = {"stream": True, "id": last.get("id"), "model": last.get("model"), "content": text}
+    return text, json.dumps(raw)[:4000]
+
+
 # --------------------------------------------------------------------
 # Prompt & deterministic rendering helpers
 # --------------------------------------------------------------------
+# Prompt layout is prefix-cache friendly: system message + fixed instructions +
+# context come first, so provider prefix caches (OpenAI/OpenRouter) can reuse
+# them when consecutive questions retrieve the same passages; only the question
+# tail varies.
+_PROMPT_HEAD = (
+    "You must answer using ONLY the context below.\n"
+    "Be concise but complete; avoid filler.\n\n"
+    "Context:\n"
+)
+
+
 def build_prompt(context: str, question: str) -> str:
-    return (
-        "You must answer using ONLY the context below.\n"
-        "Be concise but complete; avoid filler.\n\n"
-        f"Context:\n{context}\n\n"
-        f"Question: {question}\n\n"
-        "Answer:"
-    )
+    return f"{_PROMPT_HEAD}{context}\n\nQuestion: {question}\n\nAnswer:"
 
 
 def _apply_tone(text: str, tone: str) -> str:
@@ -905,19 +1110,34 @@ def _apply_tone(text: str, tone: str) -> str:
     return text
 
 
+def _parse_det_fields(text: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    Split fielded deterministic output ("Title:" then "- Key: value" lines) into
+    (title, {key_lower: value}) in one pass. Title is None for empty text.
+    """
+    title: Optional[str] = None
+    fields: Dict[str, str] = {}
+    for raw in text.strip().splitlines():
+        ln = raw.strip()
+        if not ln:
+            continue
+        if title is None:
+            title = ln.rstrip(":")
+            continue
+        if ln.startswith("- "):
+            ln = ln[2:]
+        k, sep, v = ln.partition(":")
+        if sep:
+            fields[k.strip().lower()] = v.strip()
+    return title, fields
+
+
 def _bullets_to_paragraph(text: str) -> str:
     """Convert our fielded bullet output into a compact paragraph."""
-    lines = [ln.strip() for ln in text.strip().splitlines() if ln.strip()]
-    if not lines:
+    head, raw_fields = _parse_det_fields(text)
+    if head is None:
         return text
-    head = lines[0].rstrip(":")
-    fields = {}
-    for ln in lines[1:]:
-        if ln.startswith("- "):
-            ln = ln[2:]
-        if ":" in ln:
-            k, v = ln.split(":", 1)
-            fields[k.strip().lower()] = v.strip().rstrip(".")
+    fields = {k: v.rstrip(".") for k, v in raw_fields.items()}
     segs = [head + ":"]
     if "translation" in fields:
         segs.append(f'“{fields["translation"]}”.')
@@ -941,22 +1161,11 @@ def _render_det(text: str, *, bullets: bool, tone: str) -> str:
     """
     if bullets:
         if tone == "Chatty":
-            lines = [ln.strip() for ln in text.strip().splitlines() if ln.strip()]
-            title = lines[0].rstrip(":") if lines else ""
-            fields = {}
-            for ln in lines[1:]:
-                if ln.startswith("- "):
-                    ln = ln[2:]
-                if ":" in ln:
-                    k, v = ln.split(":", 1)
-                    fields[k.strip().lower()] = v.strip()
+            _, fields = _parse_det_fields(text)
             trans = fields.get("translation")
             typ = fields.get("type")
             focus = fields.get("focus")
-            quick_bits = []
-            if trans: quick_bits.append(trans)
-            if typ: quick_bits.append(typ)
-            quick = " — ".join(quick_bits) if quick_bits else None
+            quick = " — ".join(b for b in (trans, typ) if b) or None
             if quick and focus:
                 summary = f"Quick take: {quick}; focus on {focus}."
             elif quick:
@@ -966,14 +1175,13 @@ def _render_det(text: str, *, bullets: bool, tone: str) -> str:
             else:
                 summary = None
 
-            out = []
-            if summary:
-                out.append(summary)
-            out.append(text.strip())
-            out = "\n".join(out)
-            if not out.strip().endswith("?"):
-                out += "\n\nWant examples, drills, or lineage notes next?"
-            return out
+            # One join: the body's tail decides the follow-up prompt, so there is
+            # no need to materialise the joined string before appending to it.
+            body = text.strip()
+            parts = [summary, "\n", body] if summary else [body]
+            if not body.endswith("?"):
+                parts.append("\n\nWant examples, drills, or lineage notes next?")
+            return "".join(parts)
         else:
             return text.strip()
 
@@ -982,68 +1190,232 @@ def _render_det(text: str, *, bullets: bool, tone: str) -> str:
 
 
 # --- School intent detection ---
+_SCHOOL_Q_RX = _alternation(SCHOOL_TERMS + (" ryu", " ryū"))
+_SOKE_Q_RX = _alternation([
+    "soke", "sōke", "current soke", "who is the soke", "who is the sōke",
+    "grandmaster", "current grandmaster", "who is the grandmaster"
+])
+
+
+_EXPLAIN_NO_KATA_RX = re.compile(r"\bexplain\s+.+\s+no\s+kata\b")
+_KIHON_Q_RX = _alternation(_KIHON_TRIGGERS)
+
+
 def is_school_query(question: str) -> bool:
-    ql = question.lower()
-    for canon, aliases in SCHOOL_ALIASES.items():
-        tokens = [canon.lower()] + [a.lower() for a in aliases]
-        if any(tok in ql for tok in tokens):
-            return True
-    return (" ryu" in ql) or (" ryū" in ql)
+    return _SCHOOL_Q_RX.search(question.lower()) is not None
 
 
 def is_soke_query(q: str) -> bool:
-    ql = q.lower()
-    return any(token in ql for token in [
-        "soke", "sōke", "current soke", "who is the soke", "who is the sōke",
-        "grandmaster", "current grandmaster", "who is the grandmaster"
-    ])
+    return _SOKE_Q_RX.search(q.lower()) is not None
+
+
+def _question_intents(question: str, ql: str) -> frozenset:
+    """
+    Classify the question once for answer_with_rag's deterministic dispatch:
+    one precompiled sweep per intent over the already-lowered `ql`, instead of
+    each branch re-lowering and re-scanning the question.
+    """
+    intents = set()
+    if _SOKE_Q_RX.search(ql):
+        intents.add("soke")
+    if _LEADERSHIP_Q_RX.search(ql):
+        intents.add("leadership")
+    if _SCHOOL_Q_RX.search(ql):
+        intents.add("school")
+    if is_school_list_query(question):
+        intents.add("school_list")
+    if _KIHON_Q_RX.search(ql):
+        intents.add("kihon")
+    return frozenset(intents)
 
 
 # --------------------------------------------------------------------
 # Core RAG pipeline
 # --------------------------------------------------------------------
-def answer_with_rag(question: str, k: int | None = None) -> Tuple[str, List[Dict[str, Any]], str]:
+def _inject_domain_passages(
+    question: str, hits: List[Dict[str, Any]], ql: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    All injectors in one pass: triggers are checked against a single lowered
+    question and the result list is built once. Later injectors end up first:
+    technique line, techniques, kihon, weapons, schools, leadership, rank.
+    """
+    if ql is None:
+        ql = question.lower()
+    synths = [
+        _rank_passage(ql),
+        _leadership_passage(ql),
+        _schools_passage(ql),
+        _weapons_passage(ql),
+    ]
+    out = [p for p in reversed(synths) if p] + hits
+    # Kihon reads the passages injected so far, so it sees the same head as before
+    for p in (_kihon_passage(ql, out), _techniques_passage(ql)):
+        if p:
+            out = [p] + out
+    return inject_specific_technique_line_if_needed(question, out)
+
+
+ANSWER_CACHE_MAX = 512
+
+# Semantic answer cache: reuse an answer when a new question embeds close enough
+# to a cached one. Off by default: near-identical wordings such as "3rd kyu" vs
+# "4th kyu" embed very close but need different answers.
+SEMANTIC_CACHE_MIN_SIM = float(os.getenv("SEMANTIC_CACHE_MIN_SIM", "0") or 0)
+SEMANTIC_CACHE_MAX = 1024
+
+
+@st.cache_resource(show_spinner=False)
+def _answer_cache_lock() -> threading.Lock:
+    """
+    Guards both answer caches. Streamlit sessions run on separate threads and
+    share these process-wide OrderedDicts; an unlocked iteration can race with
+    another session's insert or eviction ("mutated during iteration").
+    """
+    return threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def _answer_cache() -> "OrderedDict[tuple, Tuple[str, List[Dict[str, Any]], str]]":
+    """Process-wide exact-match answer cache (survives Streamlit reruns)."""
+    return OrderedDict()
+
+
+@st.cache_resource(show_spinner=False)
+def _semantic_cache() -> "OrderedDict[tuple, Tuple[np.ndarray, Tuple[str, List[Dict[str, Any]], str]]]":
+    """Process-wide (key -> (question vector, answer)) store for the semantic cache."""
+    return OrderedDict()
+
+
+def _semantic_lookup(settings: tuple, q_vec: np.ndarray):
+    cache = _semantic_cache()
+    # Snapshot under the lock; the similarity math runs outside it.
+    with _answer_cache_lock():
+        pairs = [(key, e) for key, e in cache.items() if key[1:] == settings]
+    if not pairs:
+        return None
+    sims = np.stack([e[0] for _, e in pairs]) @ q_vec
+    best = int(np.argmax(sims))
+    if float(sims[best]) < SEMANTIC_CACHE_MIN_SIM:
+        return None
+    key, (_, result) = pairs[best]
+    with _answer_cache_lock():
+        if key in cache:
+            cache.move_to_end(key)
+    return result
+
+
+def _semantic_store(key: tuple, q_vec: np.ndarray, result) -> None:
+    cache = _semantic_cache()
+    with _answer_cache_lock():
+        cache[key] = (q_vec, result)
+        while len(cache) > SEMANTIC_CACHE_MAX:
+            cache.popitem(last=False)
+
+
+def answer_with_rag(
+    question: str,
+    k: int | None = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, List[Dict[str, Any]], str]:
+    """
+    Cached front for _answer_with_rag. Keyed on the stripped question plus every
+    setting that changes the rendered answer; failed answers are not cached.
+    With SEMANTIC_CACHE_MIN_SIM set, a near-duplicate question (cosine >= the
+    threshold, same settings) also reuses the cached answer.
+    `on_delta` receives the partial answer while an LLM fallback streams.
+    """
     if k is None:
         k = TOP_K
+    cache = _answer_cache()
+    key = (question.strip(), k, output_style, tone_style, TECH_DETAIL_MODE)
+    with _answer_cache_lock():
+        hit = cache.get(key)
+        if hit is not None:
+            cache.move_to_end(key)
+    if hit is not None:
+        return hit
+
+    q_vec = None
+    if SEMANTIC_CACHE_MIN_SIM > 0:
+        q_vec = embed_query(question.strip())[0]
+        hit = _semantic_lookup(key[1:], q_vec)
+        if hit is not None:
+            return hit
+
+    result = _answer_with_rag(question, k, on_delta)
+    if "❌" not in result[0]:
+        with _answer_cache_lock():
+            cache[key] = result
+            while len(cache) > ANSWER_CACHE_MAX:
+                cache.popitem(last=False)
+        if q_vec is not None:
+            _semantic_store(key, q_vec, result)
+    return result
+
+
+def _llm_answer(
+    question: str,
+    hits: List[Dict[str, Any]],
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, List[Dict[str, Any]], str]:
+    prefix = "🔒 Strict (context-only, explain)\n\n"
+    ctx = build_context(hits)
+    prompt = build_prompt(ctx, question)
+    stream_cb = (lambda partial: on_delta(prefix + partial)) if on_delta else None
+    text, raw = call_llm(prompt, on_delta=stream_cb)
+    if not text.strip():
+        return "🔒 Strict (context-only)\n\n❌ Model returned no text.", hits, raw or "{}"
+    return f"{prefix}{text.strip()}", hits, raw or "{}"
+
+
+def _answer_with_rag(
+    question: str, k: int, on_delta: Optional[Callable[[str], None]] = None
+) -> Tuple[str, List[Dict[str, Any]], str]:
+    ql = question.lower()  # lowered once; passed to every keyword check below
+    bullets = output_style == "Bullets"
+    tone = tone_style
+
+    # 0) Single-technique fast path: the injected CSV line is always the top
+    #    passage and answers on its own, so look it up directly and skip the
+    #    embedder, FAISS and the other injectors entirely.
+    cand = _is_single_technique_query(question)
+    line = _find_tech_line_in_chunks(_tech_name_variants(cand)) if cand else None
+    if line:
+        pre = [_technique_line_passage(line)]
+        fast = answer_single_technique_if_synthetic(
+            pre,
+            bullets=bullets,
+            tone=tone,
+            detail_mode=TECH_DETAIL_MODE,
+        )
+        if fast:
+            return f"🔒 Strict (context-only, explain)\n\n{fast}", pre, '{"det_path":"technique/single"}'
 
     # 1) Retrieve
     hits = retrieve(question, k=k)
 
     # 2) Inject domain-critical sources
-    hits = inject_rank_passage_if_needed(question, hits)
-    hits = inject_leadership_passage_if_needed(question, hits)
-    hits = inject_schools_passage_if_needed(question, hits)
-    hits = inject_weapons_passage_if_needed(question, hits)
-    hits = inject_kihon_passage_if_needed(question, hits)
-    hits = inject_techniques_passage_if_needed(question, hits)
-    hits = inject_specific_technique_line_if_needed(question, hits)
-
-    # Fast-path: if we injected a single technique CSV line, answer immediately
-    fast = answer_single_technique_if_synthetic(
-        hits,
-        bullets=(output_style == "Bullets"),
-        tone=tone_style,
-        detail_mode=TECH_DETAIL_MODE,
-    )
-    if fast:
-        return f"🔒 Strict (context-only, explain)\n\n{fast}", hits, '{"det_path":"technique/single"}'
+    hits = _inject_domain_passages(question, hits, ql)
+
+    intents = _question_intents(question, ql)
 
     # Leadership (Sōke) gets priority over school profile if asked directly
-    if is_soke_query(question):
+    if "soke" in intents:
         ans = try_leadership(question, hits)
         if ans:
             return ans, hits, '{"det_path":"leadership/soke"}'
 
     # Schools LIST short-circuit
-    if is_school_list_query(question):
+    if "school_list" in intents:
         try:
             list_ans = try_answer_schools_list(
-                question, hits, bullets=(output_style == "Bullets")
+                question, hits, bullets=bullets
             )
         except Exception:
             list_ans = None
         if list_ans:
-            rendered = _render_det(list_ans, bullets=(output_style == "Bullets"), tone=tone_style)
+            rendered = _render_det(list_ans, bullets=bullets, tone=tone)
             return (
                 f"🔒 Strict (context-only, explain)\n\n{rendered}",
                 hits,
@@ -1051,15 +1423,15 @@ def answer_with_rag(question: str, k: int | None = None) -> Tuple[str, List[Dict
             )
 
     # School PROFILE short-circuit
-    if is_school_query(question):
+    if "school" in intents:
         try:
             school_fact = try_answer_school_profile(
-                question, hits, bullets=(output_style == "Bullets")
+                question, hits, bullets=bullets
             )
         except Exception:
             school_fact = None
         if school_fact:
-            rendered = _render_det(school_fact, bullets=(output_style == "Bullets"), tone=tone_style)
+            rendered = _render_det(school_fact, bullets=bullets, tone=tone)
             return (
                 f"🔒 Strict (context-only, explain)\n\n{rendered}",
                 hits,
@@ -1067,18 +1439,10 @@ def answer_with_rag(question: str, k: int | None = None) -> Tuple[str, List[Dict
             )
 
         # fallback LLM for schools
-        ctx = build_context(hits)
-        prompt = build_prompt(ctx, question)
-        text, raw = call_llm(prompt)
-        if not text.strip():
-            return "🔒 Strict (context-only)\n\n❌ Model returned no text.", hits, raw or "{}"
-        return f"🔒 Strict (context-only, explain)\n\n{text.strip()}", hits, raw or "{}"
+        return _llm_answer(question, hits, on_delta)
 
     # Leadership short-circuit (generic)
-    asking_soke = any(t in question.lower() for t in [
-        "soke","sōke","grandmaster","headmaster","current head","current grandmaster"
-    ])
-    if asking_soke:
+    if "leadership" in intents:
         try:
             fact = try_leadership(question, hits)
         except Exception:
@@ -1100,33 +1464,56 @@ def answer_with_rag(question: str, k: int | None = None) -> Tuple[str, List[Dict
     except Exception:
         rr = None
     if rr:
-        rendered = _render_det(rr, bullets=(output_style == "Bullets"), tone=tone_style)
+        rendered = _render_det(rr, bullets=bullets, tone=tone)
         return f"🔒 Strict (context-only, explain)\n\n{rendered}", hits, '{"det_path":"rank/requirements"}'
 
     # Kihon Happo hard short-circuit
-    q_low = (question or "").lower()
-    if "kihon happo" in q_low or "kihon happō" in q_low:
+    if "kihon" in intents:
         kihon_ans = try_answer_kihon_happo(question, hits)
         if kihon_ans:
-            rendered = _render_det(kihon_ans, bullets=(output_style == "Bullets"), tone=tone_style)
+            rendered = _render_det(kihon_ans, bullets=bullets, tone=tone)
             return f"🔒 Strict (context-only, explain)\n\n{rendered}", hits, '{"det_path":"deterministic/kihon"}'
 
     # Generic deterministic dispatcher
     fact = try_extract_answer(question, hits)
     if fact:
-        rendered = _render_det(fact, bullets=(output_style == "Bullets"), tone=tone_style)
-        ql = question.lower()
-        looks_like_kata = (" kata" in ql) or ("no kata" in ql) or re.search(r"\bexplain\s+.+\s+no\s+kata\b", ql)
+        rendered = _render_det(fact, bullets=bullets, tone=tone)
+        looks_like_kata = (" kata" in ql) or ("no kata" in ql) or _EXPLAIN_NO_KATA_RX.search(ql)
         det_tag = '{"det_path":"technique/core"}' if looks_like_kata else '{"det_path":"deterministic/core"}'
         return f"🔒 Strict (context-only, explain)\n\n{rendered}", hits, det_tag
 
     # LLM fallback with retrieved context
-    ctx = build_context(hits)
-    prompt = build_prompt(ctx, question)
-    text, raw = call_llm(prompt)
-    if not text.strip():
-        return "🔒 Strict (context-only)\n\n❌ Model returned no text.", hits, raw or "{}"
-    return f"🔒 Strict (context-only, explain)\n\n{text.strip()}", hits, raw or "{}"
+    return _llm_answer(question, hits, on_delta)
+
+
+@st.cache_resource(show_spinner=False)
+def _prime() -> bool:
+    """
+    Load index + encoder once per process and run a dummy encode/search, so the
+    first real question doesn't pay the cold start. The extractors' file-backed
+    tables are built the same way (imported modules survive reruns). Failures
+    are left for the query path to report (with the index diagnostics in the
+    sidebar).
+    """
+    idx, _ = _load_index_and_meta()
+    _load_chunk_views()
+    v = get_embedder().encode(["warmup"], normalize_embeddings=True, convert_to_numpy=True)
+    idx.search(np.ascontiguousarray(v, dtype="float32"), 1)
+    warm_extractor_caches()
+    return True
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _index_diagnostics(
+    index_dir: str, config_path: str, meta_path: str, idx_env: Optional[str]
+) -> Dict[str, Any]:
+    """Existence checks for the sidebar diagnostics; every widget event reruns the script, so stat at most every 30 s."""
+    faiss_candidates = (os.path.join(index_dir, "index.faiss"), os.path.join(index_dir, "faiss.index"))
+    paths = [config_path, meta_path, *faiss_candidates] + ([idx_env] if idx_env else [])
+    return {
+        "faiss_candidates": faiss_candidates,
+        "exists": {p: os.path.exists(p) for p in paths},
+    }
 
 
 # --------------------------------------------------------------------
@@ -1134,6 +1521,11 @@ def answer_with_rag(question: str, k: int | None = None) -> Tuple[str, List[Dict
 # --------------------------------------------------------------------
 st.set_page_config(page_title="NTTV Chatbot (RAG)", page_icon="🥋", layout="wide")
 
+try:
+    _prime()
+except Exception:
+    pass
+
 st.title("🥋 NTTV Chatbot (RAG)")
 
 with st.sidebar:
@@ -1163,6 +1555,11 @@ with st.sidebar:
     model = os.environ.get("MODEL", "gpt-4o-mini")
     st.caption(f"LLM base: `{base}`")
     st.caption(f"Model: `{model}`")
+    if st.button("Clear answer cache"):
+        with _answer_cache_lock():
+            _answer_cache().clear()
+            _semantic_cache().clear()
+        clear_dispatch_cache()
     
     if show_debug:
         st.markdown("---")
@@ -1170,39 +1567,44 @@ with st.sidebar:
             index_dir = os.getenv("INDEX_DIR", DEFAULT_INDEX_DIR)
             config_path = os.getenv("CONFIG_PATH", os.path.join(index_dir, "config.json"))
             meta_path = os.getenv("META_PATH", os.path.join(index_dir, "meta.pkl"))
+            idx_env = os.getenv("INDEX_PATH")
+            diag = _index_diagnostics(index_dir, config_path, meta_path, idx_env)
+
+            def _mark(path: str) -> str:
+                return "✅" if diag["exists"].get(path) else "❌"
 
             st.write("**Working directory:**", os.getcwd())
             st.write("**__file__ dir:**", os.path.dirname(__file__))
             st.write("**INDEX_DIR:**", index_dir)
-            st.write("**CONFIG_PATH:**", config_path, "✅" if os.path.exists(config_path) else "❌")
-            st.write("**META_PATH:**", meta_path, "✅" if os.path.exists(meta_path) else "❌")
+            st.write("**CONFIG_PATH:**", config_path, _mark(config_path))
+            st.write("**META_PATH:**", meta_path, _mark(meta_path))
 
             # Likely FAISS locations
-            idx_env = os.getenv("INDEX_PATH")
             if idx_env:
-                st.write("**INDEX_PATH (env):**", idx_env, "✅" if os.path.exists(idx_env) else "❌")
+                st.write("**INDEX_PATH (env):**", idx_env, _mark(idx_env))
 
-            faiss_guess_1 = os.path.join(index_dir, "index.faiss")
-            faiss_guess_2 = os.path.join(index_dir, "faiss.index")
-            st.write("**FAISS candidate 1:**", faiss_guess_1, "✅" if os.path.exists(faiss_guess_1) else "❌")
-            st.write("**FAISS candidate 2:**", faiss_guess_2, "✅" if os.path.exists(faiss_guess_2) else "❌")
+            faiss_guess_1, faiss_guess_2 = diag["faiss_candidates"]
+            st.write("**FAISS candidate 1:**", faiss_guess_1, _mark(faiss_guess_1))
+            st.write("**FAISS candidate 2:**", faiss_guess_2, _mark(faiss_guess_2))
     
 
 q = st.text_input("Ask a question:", value="", placeholder="e.g., what is omote gyaku")
 go = st.button("Ask", type="primary")
 
 if go and q.strip():
+    st.markdown("### Answer")
+    answer_box = st.empty()  # LLM fallbacks stream into this as tokens arrive
     try:
         with st.spinner("Thinking..."):
-            ans, top_passages, raw_json = answer_with_rag(q.strip())
+            ans, top_passages, raw_json = answer_with_rag(q.strip(), on_delta=answer_box.markdown)
     except Exception as e:
+        answer_box.empty()
         st.error(f"Backend error: {e}")
         if show_debug:
             st.exception(e)
         st.stop()
 
-    st.markdown("### Answer")
-    st.write(ans)
+    answer_box.write(ans)
 
     if show_debug:
         st.markdown("### Retrieved sources")
@@ -1,6 +1,9 @@
 # extractors/__init__.py
 
-from typing import List, Dict, Any, Optional
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Final, List, Optional, Tuple
 
 # ----- Rank-specific extractors (most precise; run first)
 from .rank import (
@@ -38,20 +41,25 @@ except ImportError:  # pragma: no cover
 
 
 # ----- Deterministic concept/technique extractors
-from .kyusho import try_answer_kyusho
+from .kyusho import KYUSHO_TRIGGERS, try_answer_kyusho
+from .kihon_happo import TRIGGER_PHRASES as KIHON_TRIGGERS
 from .kihon_happo import try_answer_kihon_happo   # keep this before generic techniques
 from .techniques import try_answer_technique
 
 # Technique diff extractor (diff between two techniques, e.g. Omote vs Ura Gyaku)
 try:
-    from .technique_diff import try_answer_technique_diff  # type: ignore
+    from .technique_diff import DIFF_MARKERS, try_answer_technique_diff  # type: ignore
 except ImportError:  # pragma: no cover
+    DIFF_MARKERS = ()
+
     def try_answer_technique_diff(question, passages):
         return None
 
+from .sanshin import SANSHIN_TRIGGERS
 from .sanshin import try_answer_sanshin           # must accept (question, passages)
 
 # Leadership (Soke lookups)
+from .leadership import SOKE_TRIGGERS, _strip_macrons
 from .leadership import try_extract_answer as try_leadership
 
 # Glossary fallback (single-term Bujinkan / ninjutsu terms)
@@ -62,99 +70,184 @@ except ImportError:  # pragma: no cover
         return None
 
 
-def try_extract_answer(
-    question: str, passages: List[Dict[str, Any]]
-) -> Optional[str]:
-    """
-    Deterministic, context-only answers for high-signal intents.
-    Return a short string or None to fall back to the LLM/generic path.
-    Order matters: most specific first.
-    """
-
-    # --- Rank-specific: Striking / Throws / Chokes
-    ans = try_answer_rank_striking(question, passages)
-    if ans:
-        return ans
+from .rank import _rank_key_from_question
 
-    ans = try_answer_rank_nage(question, passages)
-    if ans:
-        return ans
 
-    ans = try_answer_rank_jime(question, passages)
-    if ans:
-        return ans
+def _any_of(terms) -> "re.Pattern[str]":
+    """One compiled alternation, equivalent to any(t in s for t in terms)."""
+    return re.compile("|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True)))
 
-    # --- Rank-specific: Ukemi / Taihenjutsu
-    ans = try_answer_rank_ukemi(question, passages)
-    if ans:
-        return ans
 
-    ans = try_answer_rank_taihenjutsu(question, passages)
-    if ans:
-        return ans
+# Intent bits. RANK is set when the question names a rank (N kyu / shodan); the
+# others when it contains one of an extractor's trigger terms. Each keyword
+# gate takes the lowered question and mirrors that extractor's own first check,
+# built from the same trigger tuples.
+I_RANK = 1 << 0
+I_KATANA = 1 << 1
+I_KIHON = 1 << 2
+I_DIFF = 1 << 3
+I_SOKE = 1 << 4
+I_KYUSHO = 1 << 5
+I_SANSHIN = 1 << 6
 
+# Keyword intents matched on the plain lowered question, scanned in one pass:
+# one named group per intent. No term of one group overlaps (as a prefix or
+# suffix) a term of another, so the non-overlapping finditer still reports
+# every group present; tests/test_router_integration.py pins that.
+_KEYWORD_INTENTS: Final = (
+    ("katana", I_KATANA, ("katana",)),
+    ("kihon", I_KIHON, KIHON_TRIGGERS),
+    ("diff", I_DIFF, DIFF_MARKERS),
+    ("kyusho", I_KYUSHO, KYUSHO_TRIGGERS),
+)
+_KEYWORD_INTENT_RE = re.compile("|".join(
+    f"(?P<{name}>{_any_of(terms).pattern})" for name, _bit, terms in _KEYWORD_INTENTS if terms
+))
+_KEYWORD_INTENT_BITS = {name: bit for name, bit, _terms in _KEYWORD_INTENTS}
+
+# Leadership matches on the macron-stripped question, so it stays separate.
+_SOKE_RX = _any_of(SOKE_TRIGGERS)
+
+
+def _soke_gate(ql: str) -> bool:
+    return _SOKE_RX.search(_strip_macrons(ql)) is not None
+
+
+# Sanshin collapses runs of whitespace before matching, so its terms match
+# across any whitespace here. Kept out of the fused scan: "ka no kata"
+# overlaps "katana".
+_SANSHIN_RX = re.compile("|".join(
+    r"\s+".join(re.escape(w) for w in t.split())
+    for t in sorted(set(SANSHIN_TRIGGERS), key=len, reverse=True)
+))
+
+
+def _intent_mask(question: str) -> int:
+    """All intent bits for the question, computed once per dispatch."""
+    ql = question.lower()
+    mask = I_RANK if _rank_key_from_question(question) is not None else 0
+    for m in _KEYWORD_INTENT_RE.finditer(ql):
+        mask |= _KEYWORD_INTENT_BITS[m.lastgroup]
+    if _soke_gate(ql):
+        mask |= I_SOKE
+    # Kyusho matches on an accent-folded question; that only differs from
+    # the lowered one for non-ASCII input, so let those through unchecked.
+    if not question.isascii():
+        mask |= I_KYUSHO
+    if _SANSHIN_RX.search(ql):
+        mask |= I_SANSHIN
+    return mask
+
+
+# Dispatch table, in priority order (most specific first). Each entry is
+# (required intent bits, extractor): an extractor runs only if the question's
+# intent mask covers its bits, since it would return None otherwise. 0 = always.
+_EXTRACTOR_CHAIN: Final = (
+    # --- Rank-specific: Striking / Throws / Chokes
+    (I_RANK, try_answer_rank_striking),
+    (I_RANK, try_answer_rank_nage),
+    (I_RANK, try_answer_rank_jime),
+    # --- Rank-specific: Ukemi / Taihenjutsu
+    (I_RANK, try_answer_rank_ukemi),
+    (I_RANK, try_answer_rank_taihenjutsu),
     # --- Rank-specific: Kihon Happo & Sanshin kata by rank
-    ans = try_answer_rank_kihon_kata(question, passages)
-    if ans:
-        return ans
-
-    ans = try_answer_rank_sanshin_kata(question, passages)
-    if ans:
-        return ans
-
+    (I_RANK, try_answer_rank_kihon_kata),
+    (I_RANK, try_answer_rank_sanshin_kata),
     # --- Rank-specific: Requirements (ENTIRE block for "requirements for X kyu")
-    ans = try_answer_rank_requirements(question, passages)
-    if ans:
-        return ans
-
+    (I_RANK, try_answer_rank_requirements),
     # --- Rank-specific: Weapons by rank (optional, in rank.py if present)
-    ans = try_answer_rank_weapons(question, passages)
-    if ans:
-        return ans
-
+    (0, try_answer_rank_weapons),
     # --- Katana parts (very specific intent: parts/terminology of the katana)
-    ans = try_answer_katana_parts(question, passages)
-    if ans:
-        return ans
-
+    (I_KATANA, try_answer_katana_parts),
     # --- Weapon profiles (Hanbo, Kusari Fundo, Katana, Shuriken, etc.)
-    ans = try_answer_weapon_profile(question, passages)
-    if ans:
-        return ans
-
+    (0, try_answer_weapon_profile),
     # --- Concept: Kyusho (short, deterministic)
-    ans = try_answer_kyusho(question, passages)
-    if ans:
-        return ans
-
+    (I_KYUSHO, try_answer_kyusho),
     # --- Kihon Happo (run BEFORE techniques so it wins over general technique matches)
-    ans = try_answer_kihon_happo(question, passages)
-    if ans:
-        return ans
-
+    (I_KIHON, try_answer_kihon_happo),
     # --- Technique diffs (Omote Gyaku vs Ura Gyaku, etc.)
-    ans = try_answer_technique_diff(question, passages)
-    if ans:
-        return ans
-
+    (I_DIFF, try_answer_technique_diff),
     # --- Techniques (Omote Gyaku, Musha Dori, Jumonji no Kata, etc.)
-    ans = try_answer_technique(question, passages)
-    if ans:
-        return ans
-
+    (0, try_answer_technique),
     # --- Concept: Sanshin
-    ans = try_answer_sanshin(question, passages)
-    if ans:
-        return ans
-
+    (I_SANSHIN, try_answer_sanshin),
     # --- Leadership (Soke / headmaster)
-    ans = try_leadership(question, passages)
-    if ans:
-        return ans
-
+    (I_SOKE, try_leadership),
     # --- Glossary fallback (single-term definition-style questions)
-    ans = try_answer_glossary(question, passages)
-    if ans:
-        return ans
+    (0, try_answer_glossary),
+)
+
+
+# Exact-repeat memo for the whole cascade. Extractors are pure functions of the
+# question and the passages' (source, text), so that pair is the key; repeats
+# become one dict lookup. Module state survives Streamlit reruns.
+DISPATCH_CACHE_MAX = 1024
+# Streamlit sessions and API worker threads share the memo; the lock guards
+# every get/insert/evict (the chain itself runs outside it).
+_DISPATCH_CACHE: "OrderedDict[Tuple[Any, ...], Optional[str]]" = OrderedDict()
+_DISPATCH_LOCK = threading.Lock()
+_MISS = object()  # None is a valid cached result
+
+
+def clear_dispatch_cache() -> None:
+    with _DISPATCH_LOCK:
+        _DISPATCH_CACHE.clear()
+
+
+def warm_extractor_caches() -> None:
+    """
+    Build the chain's cached file-backed tables now instead of on the first
+    question that reaches them: the KYUSHO.txt points and the parsed glossary
+    file with its key indexes.
+
+    Calls the loaders directly: a dry dispatch would be gated out of most
+    extractors by the intent mask (and would leave a bogus entry in the
+    dispatch memo).
+    """
+    from . import glossary, kyusho
 
+    kyusho._file_points()
+    glossary._key_indexes(())
+
+
+def _dispatch_key(question: str, passages: List[Dict[str, Any]]) -> Tuple[Any, ...]:
+    # Source falls back to meta["source"] the same way rank.py reads it.
+    return (question, tuple(
+        (p.get("source") or (p.get("meta") or {}).get("source"), p.get("text"))
+        for p in passages
+    ))
+
+
+def try_extract_answer(
+    question: str, passages: List[Dict[str, Any]]
+) -> Optional[str]:
+    """
+    Deterministic, context-only answers for high-signal intents.
+    Return a short string or None to fall back to the LLM/generic path.
+    Order matters: most specific first (see _EXTRACTOR_CHAIN).
+    """
+    key = _dispatch_key(question, passages)
+    with _DISPATCH_LOCK:
+        hit = _DISPATCH_CACHE.get(key, _MISS)
+        if hit is not _MISS:
+            _DISPATCH_CACHE.move_to_end(key)
+    if hit is not _MISS:
+        return hit
+
+    ans = _run_chain(question, passages)
+    with _DISPATCH_LOCK:
+        _DISPATCH_CACHE[key] = ans
+        while len(_DISPATCH_CACHE) > DISPATCH_CACHE_MAX:
+            _DISPATCH_CACHE.popitem(last=False)
+    return ans
+
+
+def _run_chain(question: str, passages: List[Dict[str, Any]]) -> Optional[str]:
+    mask = _intent_mask(question)
+    for need, extractor in _EXTRACTOR_CHAIN:
+        if need & mask != need:
+            continue
+        ans = extractor(question, passages)
+        if ans:
+            return ans
     return None
@@ -1,6 +1,6 @@
 # extractors/dakentaijutsu.py
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import unicodedata
 import re
@@ -15,16 +15,46 @@ def _fold(s: str) -> str:
     """Case- and accent-insensitive fold."""
     if not s:
         return ""
+    if s.isascii():  # NFKD and the combining-mark strip are no-ops here
+        return s.lower()
     s = unicodedata.normalize("NFKD", s)
     s = "".join(ch for ch in s if not unicodedata.combining(ch))
     return s.lower()
 
 
-def _norm_space(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip()
+_WS_RE = re.compile(r"\s+")
 
 
-def _looks_like_daken_question(question: str) -> bool:
+def _norm_space(s: str) -> str:
+    return _WS_RE.sub(" ", (s or "")).strip()
+
+
+# Every trigger term the Dakentaijutsu helpers look for, as one alternation
+# with a named group per term class. try_answer_dakentaijutsu scans the
+# folded question once (_daken_tags) and both the intent gate and the list
+# dispatch work from the resulting tag set. Plain substrings, no \b, to keep
+# the old `in` semantics ("kick" also covers "kicks", "block" covers
+# "blocking"). "principles of striking" comes before the bare words so the
+# longer phrase wins at the same position.
+_DAKEN_TERMS_RE = re.compile(
+    r"(?P<daken>dakentaijutsu|daken taijutsu)"
+    r"|(?P<hoken>hoken juroppo|sixteen (?:hidden |secret )?fists)"
+    r"|(?P<uke>uke nagashi)"
+    r"|(?P<princ>principles of striking)"
+    r"|(?P<principles>principles)"
+    r"|(?P<striking>striking)"
+    r"|(?P<kicks>kick|geri)"
+    r"|(?P<blocks>block)"
+    r"|(?P<taihen>taihenjutsu)"
+)
+
+
+def _daken_tags(q: str) -> frozenset:
+    """Term classes present in the already-folded question (_fold)."""
+    return frozenset(m.lastgroup for m in _DAKEN_TERMS_RE.finditer(q))
+
+
+def _looks_like_daken_question(tags: frozenset) -> bool:
     """
     Only fire this extractor when the user clearly means Dakentaijutsu /
     striking content, so we don't fight with the technique CSV.
@@ -34,32 +64,13 @@ def _looks_like_daken_question(question: str) -> bool:
       - 'hoken juroppo' / 'sixteen hidden fists' / 'sixteen secret fists'
       - 'uke nagashi'
       - 'principles of striking'
-      - generic 'kicks' / 'blocks' / 'striking' questions without a rank
+      - generic 'kicks' / 'blocks' questions that don't mention taihenjutsu
     """
-    q = _fold(question)
-
-    if "dakentaijutsu" in q or "daken taijutsu" in q:
-        return True
-
-    if "hoken juroppo" in q:
-        return True
-    if "sixteen hidden fists" in q or "sixteen secret fists" in q or "sixteen fists" in q:
-        return True
-
-    if "uke nagashi" in q:
-        return True
-
-    if "principles of striking" in q:
+    if tags & {"daken", "hoken", "uke", "princ"}:
         return True
 
     # Generic list-style kick / block questions
-    if ("kick" in q or "kicks" in q or "geri" in q) and "taihenjutsu" not in q:
-        return True
-
-    if ("block" in q or "blocks" in q or "blocking" in q) and "taihenjutsu" not in q:
-        return True
-
-    return False
+    return bool(tags & {"kicks", "blocks"}) and "taihen" not in tags
 
 
 # ----------------- file loading -----------------
@@ -114,14 +125,43 @@ def _extract_daken_block() -> str:
     return text[start:end]
 
 
-def _parse_daken_records() -> (Dict[str, Dict[str, str]], str):
+# (records, hoken_desc) parsed from the training reference. The file only
+# changes on redeploy, so it is read and parsed once per process.
+_DAKEN_CACHE: Optional[Tuple[Dict[str, Dict[str, str]], str]] = None
+
+
+def _parse_daken_records() -> Tuple[Dict[str, Dict[str, str]], str]:
     """
     Parse the Dakentaijutsu block into:
 
         records: name -> {name, desc, category}
         hoken_desc: description text from the Hoken Juroppo Ken header
+
+    Cached after the first call; callers must treat the records as read-only.
     """
-    block = _extract_daken_block()
+    global _DAKEN_CACHE
+    if _DAKEN_CACHE is None:
+        _DAKEN_CACHE = _parse_daken_block(_extract_daken_block())
+    return _DAKEN_CACHE
+
+
+# Section heading prefix -> category, checked in order (first match wins).
+# None marks non-Dakentaijutsu sections whose bullets are skipped.
+_DAKEN_HEADINGS = (
+    ("Blocking", "Blocking"),
+    ("Striking", "Striking"),
+    ("Dakentaijutsu- Striking Techniques", "Striking"),  # continuation
+    ("Hoken Juroppo Ken-", "Hoken Juroppo Ken"),
+    ("Principles of Striking", "Principles"),
+    ("Keri-", "Kicks"),
+    ("Uke Nagashi-", "Uke Nagashi"),
+    ("NOTES", None),
+    ("Zanshin-", None),
+)
+_HEADING_PREFIXES = tuple(prefix for prefix, _cat in _DAKEN_HEADINGS)
+
+
+def _parse_daken_block(block: str) -> Tuple[Dict[str, Dict[str, str]], str]:
     if not block:
         return {}, ""
 
@@ -143,43 +183,18 @@ def _parse_daken_records() -> (Dict[str, Dict[str, str]], str):
         if not line:
             continue
 
-        # Section headings
-        if line.startswith("Blocking"):
-            current_cat = "Blocking"
-            continue
-
-        if line.startswith("Striking"):
-            current_cat = "Striking"
-            continue
-
-        if line.startswith("Dakentaijutsu- Striking Techniques"):
-            # continuation of striking section
-            current_cat = "Striking"
-            continue
-
-        if line.startswith("Hoken Juroppo Ken-"):
-            current_cat = "Hoken Juroppo Ken"
-            # e.g. "Hoken Juroppo Ken- The Sixteen Hidden/Secret Fists"
-            parts = line.split("-", 1)
-            if len(parts) == 2:
-                hoken_desc = parts[1].strip()
-            continue
-
-        if line.startswith("Principles of Striking"):
-            current_cat = "Principles"
-            continue
-
-        if line.startswith("Keri-"):
-            current_cat = "Kicks"
-            continue
-
-        if line.startswith("Uke Nagashi-"):
-            current_cat = "Uke Nagashi"
-            continue
-
-        # Non-Dakentaijutsu headings we want to skip (NOTES, Zanshin etc.)
-        if line.startswith("NOTES") or line.startswith("Zanshin-"):
-            current_cat = None
+        # Section headings: one startswith over every prefix, so bullet
+        # lines (most of the block) cost a single check.
+        if line.startswith(_HEADING_PREFIXES):
+            for prefix, cat in _DAKEN_HEADINGS:
+                if line.startswith(prefix):
+                    current_cat = cat
+                    break
+            if current_cat == "Hoken Juroppo Ken":
+                # e.g. "Hoken Juroppo Ken- The Sixteen Hidden/Secret Fists"
+                parts = line.split("-", 1)
+                if len(parts) == 2:
+                    hoken_desc = parts[1].strip()
             continue
 
         if current_cat not in valid_cats:
@@ -260,62 +275,86 @@ def _answer_principles(records: Dict[str, Dict[str, str]]) -> Optional[str]:
     return "Principles of striking: " + "; ".join(items)
 
 
-def _answer_list_style(question: str, records: Dict[str, Dict[str, str]], hoken_desc: str) -> Optional[str]:
-    q = _fold(question)
+# Category -> tag from _daken_tags for list-style questions, checked in
+# order (first category with a non-empty answer wins). Principles is handled
+# separately because it also fires on both words appearing apart.
+_LIST_TRIGGERS = (
+    ("Hoken Juroppo Ken", "hoken"),
+    ("Kicks", "kicks"),
+    ("Blocking", "blocks"),
+    ("Uke Nagashi", "uke"),
+)
+
+# Prebuilt list answers per category, built once per records dict (the
+# records themselves are cached per process, see _parse_daken_records).
+_DAKEN_LIST_ANSWERS: Optional[Tuple[Dict[str, Dict[str, str]], Dict[str, Optional[str]]]] = None
+
+
+def _daken_list_answers(records: Dict[str, Dict[str, str]], hoken_desc: str) -> Dict[str, Optional[str]]:
+    global _DAKEN_LIST_ANSWERS
+    if _DAKEN_LIST_ANSWERS is None or _DAKEN_LIST_ANSWERS[0] is not records:
+        answers = {
+            "Hoken Juroppo Ken": _answer_hoken_list(hoken_desc, records),
+            "Kicks": _answer_kicks_list(records),
+            "Blocking": _answer_blocks_list(records),
+            "Uke Nagashi": _answer_uke_nagashi(records),
+            "Principles": _answer_principles(records),
+        }
+        _DAKEN_LIST_ANSWERS = (records, answers)
+    return _DAKEN_LIST_ANSWERS[1]
+
+
+def _answer_list_style(tags: frozenset, records: Dict[str, Dict[str, str]], hoken_desc: str) -> Optional[str]:
+    answers = _daken_list_answers(records, hoken_desc)
+
+    for cat, tag in _LIST_TRIGGERS:
+        if answers[cat] and tag in tags:
+            return answers[cat]
 
-    # Hoken Juroppo Ken
-    if "hoken juroppo" in q or "sixteen hidden fists" in q or "sixteen secret fists" in q or "sixteen fists" in q:
-        ans = _answer_hoken_list(hoken_desc, records)
-        if ans:
-            return ans
-
-    # Kicks
-    if "kick" in q or "kicks" in q or "geri" in q:
-        ans = _answer_kicks_list(records)
-        if ans:
-            return ans
-
-    # Blocks
-    if "block" in q or "blocks" in q or "blocking" in q:
-        ans = _answer_blocks_list(records)
-        if ans:
-            return ans
-
-    # Uke Nagashi
-    if "uke nagashi" in q:
-        ans = _answer_uke_nagashi(records)
-        if ans:
-            return ans
-
-    # Principles
-    if "principles of striking" in q or ("principles" in q and "striking" in q):
-        ans = _answer_principles(records)
-        if ans:
-            return ans
+    # Principles ("principles of striking" or both words anywhere)
+    if answers["Principles"] and ("princ" in tags or {"principles", "striking"} <= tags):
+        return answers["Principles"]
 
     return None
 
 
-def _answer_specific_daken(question: str, records: Dict[str, Dict[str, str]]) -> Optional[str]:
+# One pattern over every record name, built once per records dict. Each
+# alternative is a lookahead, so finditer tries every position; alternatives
+# are in record order, so at each position the earliest record that matches
+# wins, and the minimum over positions is the first record the old per-key
+# loop would have found.
+_DAKEN_NAME_INDEX: Optional[Tuple[Dict[str, Dict[str, str]], Optional["re.Pattern[str]"], Dict[str, int]]] = None
+
+
+def _daken_name_index(records: Dict[str, Dict[str, str]]) -> Tuple[Optional["re.Pattern[str]"], Dict[str, int]]:
+    global _DAKEN_NAME_INDEX
+    if _DAKEN_NAME_INDEX is None or _DAKEN_NAME_INDEX[0] is not records:
+        keys = [k for k in records if k]
+        rx = re.compile(r"(?=\b(" + "|".join(re.escape(k) for k in keys) + r")\b)") if keys else None
+        _DAKEN_NAME_INDEX = (records, rx, {k: i for i, k in enumerate(keys)})
+    return _DAKEN_NAME_INDEX[1], _DAKEN_NAME_INDEX[2]
+
+
+def _answer_specific_daken(q: str, records: Dict[str, Dict[str, str]]) -> Optional[str]:
     """
     Try to match a specific strike/block/kick name in the question.
     This is used when the user mentions Dakentaijutsu or clearly
     means striking, not general techniques.
     """
-    q = _fold(question)
-    for key, rec in records.items():
-        if not key:
-            continue
-        pattern = r"\b" + re.escape(key) + r"\b"
-        if re.search(pattern, q):
-            name = rec["name"]
-            desc = rec["desc"]
-            cat = rec.get("category") or "Dakentaijutsu"
-            if desc:
-                return f"{name} ({cat}): {desc}"
-            else:
-                return f"{name} ({cat})."
-    return None
+    rx, order = _daken_name_index(records)
+    if rx is None:
+        return None
+    key = min((m.group(1) for m in rx.finditer(q)), key=order.__getitem__, default=None)
+    if key is None:
+        return None
+    rec = records[key]
+    name = rec["name"]
+    desc = rec["desc"]
+    cat = rec.get("category") or "Dakentaijutsu"
+    if desc:
+        return f"{name} ({cat}): {desc}"
+    else:
+        return f"{name} ({cat})."
 
 
 # ----------------- public entrypoint -----------------
@@ -335,7 +374,9 @@ def try_answer_dakentaijutsu(question: str, passages: List[Dict[str, Any]]) -> O
           - 'in dakentaijutsu, what is Jodan Uke?'
           - 'explain Ken Kudaki in dakentaijutsu'
     """
-    if not _looks_like_daken_question(question):
+    q = _fold(question)
+    tags = _daken_tags(q)
+    if not _looks_like_daken_question(tags):
         return None
 
     records, hoken_desc = _parse_daken_records()
@@ -343,12 +384,12 @@ def try_answer_dakentaijutsu(question: str, passages: List[Dict[str, Any]]) -> O
         return None
 
     # 1) List-style questions (Hoken, kicks, blocks, uke nagashi, principles)
-    ans = _answer_list_style(question, records, hoken_desc)
+    ans = _answer_list_style(tags, records, hoken_desc)
     if ans:
         return ans
 
     # 2) Specific named strike/block/kick
-    ans = _answer_specific_daken(question, records)
+    ans = _answer_specific_daken(q, records)
     if ans:
         return ans
 
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Final, Optional
 import unicodedata
 import re
 
@@ -7,6 +7,8 @@ import re
 def _fold(s: str) -> str:
     if not s:
         return ""
+    if s.isascii():  # NFKD and the combining-mark strip are no-ops here
+        return s.lower()
     s = unicodedata.normalize("NFKD", s)
     s = "".join(ch for ch in s if not unicodedata.combining(ch))
     return s.lower()
@@ -75,68 +77,75 @@ ZANSHIN_ADVANCED_TEXT = (
     "This advanced zanshin is about expanding awareness beyond the immediate target so you can move safely and effectively."
 )
 
+# General 'what is zanshin?' answer: both levels.
+ZANSHIN_COMBINED_TEXT = ZANSHIN_BEGINNER_TEXT + "\n\n" + ZANSHIN_ADVANCED_TEXT
+
+ETIQUETTE_9TH_KYU_TEXT = (
+    "Dojo etiquette at 9th Kyu in this curriculum includes:\n"
+    "• Learning the bow-in procedure so you can line up, bow to shomen, bow to the instructor, and "
+    "bow to your training partners correctly.\n"
+    "• Knowing how to bow in respectfully if you arrive late to class.\n"
+    "• Using basic dojo Japanese phrases such as “Onegaishimasu”, “Domo arigato gozaimashita”, "
+    "“Shiken Haramitsu Daikomyo”, and “Yame”, and being able to count from 1 to 10 in Japanese during drills.\n"
+    "• Practicing basic zanshin (awareness): keeping your mouth closed, hands up, and knowing who Hatsumi "
+    "and Takamatsu are in the Bujinkan lineage.\n"
+    "These are foundation-level etiquette skills expected of a new Bujinkan student."
+)
 
-# ----------------- intent helpers -----------------
-
-
-def _looks_like_etiquette_question(question: str) -> bool:
-    q = _fold(question)
-    return any(
-        key in q
-        for key in [
-            "etiquette",
-            "dojo etiquette",
-            "bow in",
-            "bowing in",
-            "bow-in",
-            "zanshin",
-            "basic dojo japanese",
-            "dojo japanese",
-            "japanese phrases",
-            "late to class",
-            "arrive late",
-            "coming in late",
-            "count in japanese",
-            "japanese numbers",
-        ]
-    )
-
-
-def _wants_bow_in(question: str) -> bool:
-    q = _fold(question)
-    return ("bow in" in q or "bow-in" in q or "bowing in" in q) and "late" not in q
-
-
-def _wants_bow_late(question: str) -> bool:
-    q = _fold(question)
-    return ("bow" in q and "late" in q) or "arrive late" in q or "coming in late" in q
-
-
-def _wants_dojo_japanese(question: str) -> bool:
-    q = _fold(question)
-    return (
-        "basic dojo japanese" in q
-        or "dojo japanese" in q
-        or "japanese phrases" in q
-    )
+# Concise general summary for etiquette-ish questions that match no subtype.
+ETIQUETTE_FALLBACK_TEXT = (
+    "This curriculum expects you to understand basic dojo etiquette: how to bow in, how to bow in late without "
+    "disrupting class, how to use key Japanese phrases like “Onegaishimasu” and “Domo arigato gozaimashita”, "
+    "how to count from 1 to 10 in Japanese during drills, and how to maintain zanshin (awareness) in the dojo."
+)
 
 
-def _wants_counting(question: str) -> bool:
-    q = _fold(question)
-    return (
-        ("count" in q or "numbers" in q)
-        and ("japanese" in q or "in japanese" in q)
-    ) or "count in japanese" in q or "japanese numbers" in q
+# ----------------- intent helpers -----------------
 
 
-def _wants_zanshin(question: str) -> bool:
-    q = _fold(question)
-    return "zanshin" in q or ("awareness" in q and "zanshin" in q)
+# Intent gate keywords. Phrases that contain another keyword ("dojo
+# etiquette", "basic dojo japanese") are left out; the shorter one already
+# matches.
+ETIQUETTE_TRIGGERS: Final = (
+    "etiquette",
+    "bow in",
+    "bowing in",
+    "bow-in",
+    "zanshin",
+    "dojo japanese",
+    "japanese phrases",
+    "late to class",
+    "arrive late",
+    "coming in late",
+    "count in japanese",
+    "japanese numbers",
+)
 
 
-def _wants_advanced_zanshin(question: str) -> bool:
-    q = _fold(question)
-    return ("advanced" in q and "zanshin" in q) or ("higher level" in q and "zanshin" in q)
+# Takes the already-folded question (_fold); try_answer_etiquette folds once.
+def _looks_like_etiquette_question(q: str) -> bool:
+    return any(key in q for key in ETIQUETTE_TRIGGERS)
+
+
+# Sub-intents, checked in order (first match wins). Each row is
+# (all of, any of, none of, answer): every "all" term present, at least one
+# "any" term when that tuple is non-empty, and no "none" term.
+_ETIQUETTE_INTENTS: Final = (
+    # Bowing in late
+    (("bow", "late"), (), (), BOW_LATE_TEXT),
+    ((), ("arrive late", "coming in late"), (), BOW_LATE_TEXT),
+    # Bow-in procedure
+    ((), ("bow in", "bow-in", "bowing in"), ("late",), BOW_IN_TEXT),
+    # Counting ("count in japanese" / "japanese numbers" included)
+    (("japanese",), ("count", "numbers"), (), COUNTING_TEXT),
+    # Phrases + a brief counting mention
+    ((), ("dojo japanese", "japanese phrases"), (), DOJO_JAPANESE_TEXT),
+    # Zanshin: the advanced version if they ask for it, else both levels
+    (("zanshin",), ("advanced", "higher level"), (), ZANSHIN_ADVANCED_TEXT),
+    (("zanshin",), (), (), ZANSHIN_COMBINED_TEXT),
+    # Generic etiquette question
+    (("etiquette",), (), (), ETIQUETTE_9TH_KYU_TEXT),
+)
 
 
 # ----------------- public entrypoint -----------------
@@ -154,48 +163,17 @@ def try_answer_etiquette(question: str, passages: List[Dict[str, Any]]) -> Optio
       * 'how do you count in Japanese?'
       * 'what is zanshin?' / 'what is advanced zanshin?'
     """
-    if not _looks_like_etiquette_question(question):
+    q = _fold(question)
+    if not _looks_like_etiquette_question(q):
         return None
 
-    if _wants_bow_late(question):
-        return BOW_LATE_TEXT
+    for all_of, any_of, none_of, answer in _ETIQUETTE_INTENTS:
+        if (
+            all(t in q for t in all_of)
+            and (not any_of or any(t in q for t in any_of))
+            and not any(t in q for t in none_of)
+        ):
+            return answer
 
-    if _wants_bow_in(question):
-        return BOW_IN_TEXT
-
-    if _wants_counting(question):
-        return COUNTING_TEXT
-
-    if _wants_dojo_japanese(question):
-        # Include phrases + a brief counting mention
-        return DOJO_JAPANESE_TEXT
-
-    if _wants_zanshin(question):
-        # If they explicitly ask for advanced, show that version
-        if _wants_advanced_zanshin(question):
-            return ZANSHIN_ADVANCED_TEXT
-        # General 'what is zanshin?'
-        return ZANSHIN_BEGINNER_TEXT + "\n\n" + ZANSHIN_ADVANCED_TEXT
-
-    # Generic etiquette question
-    q = _fold(question)
-    if "etiquette" in q or "dojo etiquette" in q:
-        return (
-            "Dojo etiquette at 9th Kyu in this curriculum includes:\n"
-            "• Learning the bow-in procedure so you can line up, bow to shomen, bow to the instructor, and "
-            "bow to your training partners correctly.\n"
-            "• Knowing how to bow in respectfully if you arrive late to class.\n"
-            "• Using basic dojo Japanese phrases such as “Onegaishimasu”, “Domo arigato gozaimashita”, "
-            "“Shiken Haramitsu Daikomyo”, and “Yame”, and being able to count from 1 to 10 in Japanese during drills.\n"
-            "• Practicing basic zanshin (awareness): keeping your mouth closed, hands up, and knowing who Hatsumi "
-            "and Takamatsu are in the Bujinkan lineage.\n"
-            "These are foundation-level etiquette skills expected of a new Bujinkan student."
-        )
-
-    # Fallback: if we matched the broad etiquette intent but not a subtype,
-    # return a concise general etiquette summary.
-    return (
-        "This curriculum expects you to understand basic dojo etiquette: how to bow in, how to bow in late without "
-        "disrupting class, how to use key Japanese phrases like “Onegaishimasu” and “Domo arigato gozaimashita”, "
-        "how to count from 1 to 10 in Japanese during drills, and how to maintain zanshin (awareness) in the dojo."
-    )
+    # Matched the broad etiquette intent but not a subtype
+    return ETIQUETTE_FALLBACK_TEXT
@@ -18,21 +18,36 @@ from __future__ import annotations
 
 import os
 import re
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 
 # ----------------------------------------------------------------------
 # Basic helpers
 # ----------------------------------------------------------------------
 
+_WS_RE = re.compile(r"\s+")
+# Hyphen / non-breaking hyphen / en dash / em dash -> "-"
+_DASH_TABLE = str.maketrans(dict.fromkeys("\u2010\u2011\u2013\u2014", "-"))
+_TERM_DEF_DASHES = ("-", "\u2013", "\u2014")  # hyphen, en dash, em dash
+_ASK_TAIL_RE = re.compile(
+    r"(?:what\s+is|what's|define|definition of|meaning of|what does)\s+(.+)$",
+    re.IGNORECASE,
+)
+_NOISE_RE = re.compile(
+    r"\b(in japanese|in ninjutsu|in bujinkan|term|word|mean|meaning)\b",
+    re.IGNORECASE,
+)
+
+
 def _fold(s: str) -> str:
     """Lowercase, collapse whitespace, strip basic punctuation."""
     s = (s or "")
-    s = s.replace("\u2010", "-").replace("\u2011", "-").replace("\u2013", "-").replace("\u2014", "-")
-    s = s.replace("–", "-").replace("—", "-")
+    s = s.translate(_DASH_TABLE)
     s = s.strip().lower()
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     return s
 
 
@@ -45,8 +60,17 @@ def _same_source_name(p_source: str, target_name: str) -> bool:
     return base_actual == base_target
 
 
-def _looks_like_glossary_question(question: str) -> bool:
-    q = _fold(question)
+# Passages come from a handful of source files, and each question checks the
+# same source strings again (glossary, then technique disambiguation); cache
+# the basename/lowercase work per (source, target).
+@lru_cache(maxsize=256)
+def _is_source(p_source: str, target_name: str, hint: str) -> bool:
+    """Basename match on target_name, or `hint` anywhere in the lowered source."""
+    return _same_source_name(p_source, target_name) or hint in p_source.lower()
+
+
+def _looks_like_glossary_question(q: str) -> bool:
+    """`q` is the already-folded question (_fold)."""
     # Strong definition signals
     if any(t in q for t in ["what is", "what's", "define", "definition of", "meaning of", "what does", "translate"]):
         return True
@@ -61,8 +85,20 @@ def _looks_like_glossary_question(question: str) -> bool:
 # Glossary loading & parsing
 # ----------------------------------------------------------------------
 
+# Full glossary file text. The file only changes on redeploy, so it is read
+# once per process instead of on every glossary question.
+_FILE_TEXT_CACHE: Optional[str] = None
+
+
 def _load_full_glossary_file() -> str:
     """Try to read the full Glossary file from disk (if available)."""
+    global _FILE_TEXT_CACHE
+    if _FILE_TEXT_CACHE is None:
+        _FILE_TEXT_CACHE = _read_full_glossary_file()
+    return _FILE_TEXT_CACHE
+
+
+def _read_full_glossary_file() -> str:
     here = Path(__file__).resolve()
     candidates = [
         here.parent.parent / "data" / "Glossary - edit.txt",
@@ -77,29 +113,70 @@ def _load_full_glossary_file() -> str:
     return ""
 
 
-def _gather_glossary_text(passages: List[Dict[str, Any]]) -> str:
-    """Combine any retrieved glossary chunks with the full file on disk."""
-    chunks: List[str] = []
+def _retrieved_glossary_chunks(passages: List[Dict[str, Any]]) -> tuple[str, ...]:
+    """Retrieved glossary chunk texts in retrieval order, repeats dropped."""
+    chunks: Dict[str, None] = {}
     for p in passages:
-        src_raw = p.get("source") or ""
-        if _same_source_name(src_raw, "Glossary - edit.txt") or "glossary" in src_raw.lower():
+        if _is_source(p.get("source") or "", "Glossary - edit.txt", "glossary"):
             txt = p.get("text", "")
             if txt:
-                chunks.append(txt)
+                chunks.setdefault(txt)
+    return tuple(chunks)
 
-    full_file = _load_full_glossary_file()
-    if full_file.strip():
-        chunks.append(full_file)
 
-    return "\n".join(chunks)
+@lru_cache(maxsize=8)
+def _glossary_entries(chunks: tuple[str, ...]) -> Dict[str, tuple[str, str]]:
+    """Entries from the retrieved chunks first, in retrieval order, then the
+    rest of the full file on disk.
+
+    The chunks were cut from the file at ingest, so only they are parsed per
+    call; the file itself is parsed once (see _parse_glossary's cache). A key
+    the file defines keeps the file's definition, since a chunk can end
+    mid-definition.
 
+    Cached on the chunks; callers must treat the mapping as read-only.
+    """
+    file_entries = _parse_glossary(_load_full_glossary_file())
+    if not chunks:
+        return file_entries
 
+    entries: Dict[str, tuple[str, str]] = {}
+    # Already cached here on the chunk tuple: skip _parse_glossary's cache so
+    # per-question chunk text does not evict the file's entry.
+    for key, term_def in _parse_glossary.__wrapped__("\n".join(chunks)).items():
+        entries[key] = file_entries.get(key, term_def)
+    for key, term_def in file_entries.items():
+        entries.setdefault(key, term_def)
+    return entries
+
+
+def _split_term_def(line: str) -> Optional[tuple[str, str]]:
+    """Split a stripped 'Term - Definition' line at its first dash.
+
+    The term needs at least one character before the dash and the definition
+    at least one after it; otherwise the line is not a term line.
+    """
+    hits = [i for i in (line.find(d, 1) for d in _TERM_DEF_DASHES) if i != -1]
+    if not hits:
+        return None
+    i = min(hits)
+    definition = line[i + 1:].strip()
+    if not definition:
+        return None
+    return line[:i].strip(), definition
+
+
+# Parsed once for the full file; _glossary_entries layers the retrieved chunks
+# on top of it.
+@lru_cache(maxsize=8)
 def _parse_glossary(text: str) -> Dict[str, tuple[str, str]]:
     """Parse lines of the form 'Term - Definition' into a mapping.
 
     Returns: { folded_term -> (display_term, definition) }
     Handles simple continuation lines (lines that don't contain a dash) as
     extensions of the previous definition.
+
+    Cached on the text; callers must treat the mapping as read-only.
     """
     entries: Dict[str, tuple[str, str]] = {}
     last_key: Optional[str] = None
@@ -113,10 +190,9 @@ def _parse_glossary(text: str) -> Dict[str, tuple[str, str]]:
             continue
 
         # Match "Term - Definition" with various dash types
-        m = re.match(r"^(.+?)\s*[-–—]\s*(.+)$", line)
-        if m:
-            term = m.group(1).strip()
-            definition = m.group(2).strip()
+        split = _split_term_def(line)
+        if split:
+            term, definition = split
             key = _fold(term)
             if key and key not in entries:
                 entries[key] = (term, definition)
@@ -137,52 +213,99 @@ def _parse_glossary(text: str) -> Dict[str, tuple[str, str]]:
 def _extract_candidate(question: str) -> str:
     """Extract the term fragment from a 'what is / define / meaning of' question."""
     q = question.strip()
-    m = re.search(
-        r"(?:what\s+is|what's|define|definition of|meaning of|what does)\s+(.+)$",
-        q,
-        flags=re.IGNORECASE,
-    )
+    m = _ASK_TAIL_RE.search(q)
     cand = (m.group(1) if m else q).strip()
     # Remove trailing question/punctuation
     cand = cand.rstrip("?!., ")
     # Strip common noise suffixes
-    cand = re.sub(
-        r"\b(in japanese|in ninjutsu|in bujinkan|term|word|mean|meaning)\b",
-        "",
-        cand,
-        flags=re.IGNORECASE,
-    )
+    cand = _NOISE_RE.sub("", cand)
     return cand.strip()
 
 
+def _candidate_term(question: str) -> str:
+    """Folded candidate term; extracted once per question and shared."""
+    return _fold(_extract_candidate(question))
+
+
+# Substring index over a list of glossary keys: (keys, key -> position,
+# "\n"-joined keys, start offset of each key in the join, shortest and
+# longest key length). Lets "first key (in entry order) that contains `s` or
+# is contained in `s`" run as one str.find plus dict probes over the
+# substrings of `s`, instead of two `in` tests per glossary entry.
+_KeyIndex = Tuple[List[str], Dict[str, int], str, List[int], int, int]
+
+
+def _build_key_index(keys: List[str]) -> _KeyIndex:
+    starts: List[int] = []
+    at = 0
+    for k in keys:
+        starts.append(at)
+        at += len(k) + 1
+    lens = [len(k) for k in keys] or [0]
+    return keys, {k: i for i, k in enumerate(keys)}, "\n".join(keys), starts, min(lens), max(lens)
+
+
+def _first_related_key(s: str, index: _KeyIndex) -> Optional[str]:
+    """Earliest indexed key with `s in key` or `key in s` (`s` is non-empty)."""
+    keys, pos, blob, starts, min_len, max_len = index
+    best = len(keys)
+
+    # s in key: keys never contain "\n" and neither does s (folded), so the
+    # first hit in the join is inside the earliest key containing s.
+    at = blob.find(s)
+    if at != -1:
+        best = bisect_right(starts, at) - 1
+
+    # key in s: probe every substring of s whose length a key can have.
+    n = len(s)
+    for i in range(n):
+        for j in range(i + min_len, min(n, i + max_len) + 1):
+            k = pos.get(s[i:j])
+            if k is not None and k < best:
+                best = k
+
+    return keys[best] if best < len(keys) else None
+
+
+@lru_cache(maxsize=8)
+def _key_indexes(chunks: tuple[str, ...]) -> Tuple[_KeyIndex, _KeyIndex]:
+    """(index over keys of 4+ chars, index over all keys) of
+    _glossary_entries(chunks), cached on the same chunks."""
+    keys = list(_glossary_entries(chunks))
+    return _build_key_index([k for k in keys if len(k) >= 4]), _build_key_index(keys)
+
+
 def _choose_glossary_entry(
-    question: str, entries: Dict[str, tuple[str, str]]
+    cand_fold: str, chunks: tuple[str, ...]
 ) -> Optional[tuple[str, str]]:
+    """`cand_fold` is the folded candidate term (_candidate_term); `chunks`
+    are the retrieved glossary chunks (_retrieved_glossary_chunks)."""
+    entries = _glossary_entries(chunks)
     if not entries:
         return None
 
-    cand_raw = _extract_candidate(question)
-    cand_fold = _fold(cand_raw)
-    if not cand_fold or len(cand_fold) < 3:
-        return None
-
     # 1) Direct key match
     if cand_fold in entries:
         return entries[cand_fold]
 
+    long_index, all_index = _key_indexes(chunks)
+
     # 2) Allow substring containment for reasonably specific terms
-    for key, (term, definition) in entries.items():
-        if len(key) >= 4 and (cand_fold in key or key in cand_fold):
-            return term, definition
+    key = _first_related_key(cand_fold, long_index)
+    if key is not None:
+        return entries[key]
 
     # 3) Fallback: try using just the last 1–2 words as the term
     tokens = cand_fold.split()
     for span in (2, 1):
         if len(tokens) >= span:
             sub = " ".join(tokens[-span:])
-            for key, (term, definition) in entries.items():
-                if sub == key or (len(sub) >= 4 and (sub in key or key in sub)):
-                    return term, definition
+            if len(sub) >= 4:
+                key = _first_related_key(sub, all_index)
+            else:
+                key = sub if sub in entries else None
+            if key is not None:
+                return entries[key]
 
     return None
 
@@ -201,15 +324,17 @@ def _gather_technique_text(passages: List[Dict[str, Any]]) -> str:
     """Collect Technique Descriptions text from retrieved passages."""
     chunks: List[str] = []
     for p in passages:
-        src_raw = p.get("source") or ""
-        if _same_source_name(src_raw, "Technique Descriptions.md") or "technique descriptions" in src_raw.lower():
+        if _is_source(p.get("source") or "", "Technique Descriptions.md", "technique descriptions"):
             txt = p.get("text", "")
             if txt:
                 chunks.append(txt)
     return "\n".join(chunks)
 
 
-def _extract_technique_names(md_text: str) -> set[str]:
+# The same Technique Descriptions chunks come back for every technique-ish
+# question, so cache the name set on the gathered text.
+@lru_cache(maxsize=4)
+def _extract_technique_names(md_text: str) -> frozenset[str]:
     """Extract technique names (first CSV column) from Technique Descriptions.md."""
     names: set[str] = set()
     for raw in (md_text or "").splitlines():
@@ -223,10 +348,10 @@ def _extract_technique_names(md_text: str) -> set[str]:
         first = raw.split(",", 1)[0].strip()
         if first:
             names.add(_fold(first))
-    return names
+    return frozenset(names)
 
 
-def _looks_like_technique_term(question: str, passages: List[Dict[str, Any]]) -> bool:
+def _looks_like_technique_term(q: str, cand: str, passages: List[Dict[str, Any]]) -> bool:
     """
     Return True if the question appears to be about a specific technique/kata.
 
@@ -235,8 +360,10 @@ def _looks_like_technique_term(question: str, passages: List[Dict[str, Any]]) ->
        strongly suggest a technique/kata and are enough to make the glossary back off.
     2) Data-aware: if Technique Descriptions are present and the candidate matches
        a known technique name, also back off.
+
+    `q` is the already-folded question (_fold), `cand` the folded candidate
+    term (_candidate_term).
     """
-    q = _fold(question)
 
     # Strong kata/waza indicators
     if " no kata" in q or "kata" in q or "waza" in q:
@@ -247,10 +374,6 @@ def _looks_like_technique_term(question: str, passages: List[Dict[str, Any]]) ->
         return True
 
     # Data-aware check using Technique Descriptions (if available)
-    cand = _fold(_extract_candidate(question))
-    if len(cand) < 3:
-        return False
-
     md_text = _gather_technique_text(passages)
     if not md_text.strip():
         return False
@@ -280,20 +403,21 @@ def _looks_like_technique_term(question: str, passages: List[Dict[str, Any]]) ->
 
 def try_answer_glossary(question: str, passages: List[Dict[str, Any]]) -> Optional[str]:
     """Glossary-based fallback definition for single-term style questions."""
-    if not _looks_like_glossary_question(question):
+    q = _fold(question)
+    if not _looks_like_glossary_question(q):
         return None
 
-    # Disambiguation: if this clearly looks like a technique/kata, let the
-    # technique/rank extractors (or LLM) answer instead.
-    if _looks_like_technique_term(question, passages):
+    # Too short to pick an entry with; bail before any passage/file work.
+    cand = _candidate_term(question)
+    if len(cand) < 3:
         return None
 
-    text = _gather_glossary_text(passages)
-    if not text.strip():
+    # Disambiguation: if this clearly looks like a technique/kata, let the
+    # technique/rank extractors (or LLM) answer instead.
+    if _looks_like_technique_term(q, cand, passages):
         return None
 
-    entries = _parse_glossary(text)
-    term_def = _choose_glossary_entry(question, entries)
+    term_def = _choose_glossary_entry(cand, _retrieved_glossary_chunks(passages))
     if not term_def:
         return None
 
@@ -220,13 +220,16 @@ def _looks_like_gyaku_question(question: str, alias_to_name: Dict[str, str]) ->
     return False
 
 
+_RANK_Q_RE = re.compile(r"\b(\d+)(st|nd|rd|th)?\s*kyu\b")
+
+
 def _extract_rank_from_question(question: str) -> Optional[str]:
     """
     Extract rank phrase from the question, if any.
     e.g. '6th kyu', '3rd kyu', 'shodan'
     """
     q = _fold(question)
-    m = re.search(r"\b(\d+)(st|nd|rd|th)?\s*kyu\b", q)
+    m = _RANK_Q_RE.search(q)
     if m:
         return m.group(0)
     if "shodan" in q:
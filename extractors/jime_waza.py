@@ -40,6 +40,9 @@ def _load_training_text() -> str:
 # ----------------- parse Jime Waza block -----------------
 
 
+_DASH_RUN_RE = re.compile(r"[–\-−]+")
+
+
 def _parse_jime_waza() -> Dict[str, Dict[str, str]]:
     """
     Parse the 'Jime Waza− “Choking” Waza' section from the NTTV
@@ -84,7 +87,7 @@ def _parse_jime_waza() -> Dict[str, Dict[str, str]]:
                 bullet = line
 
             # Normalize the dash variants
-            parts = re.split(r"[–\-−]+", bullet, maxsplit=1)
+            parts = _DASH_RUN_RE.split(bullet, maxsplit=1)
             if not parts:
                 continue
 
@@ -9,8 +9,12 @@ from .common import join_oxford
 
 # ----------------- small helpers -----------------
 
+_WS_RE = re.compile(r"\s+")
+_KYU_HEADER_RE = re.compile(r"\b(\d+)(st|nd|rd|th)\s+kyu\b")
+_KYU_RE = re.compile(r"(\d+)(st|nd|rd|th)\s+kyu")
+
 def _norm(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip()
+    return _WS_RE.sub(" ", (s or "")).strip()
 
 
 def _fold(s: str) -> str:
@@ -189,7 +193,7 @@ def _extract_rank_kamae(rank_label: str) -> Optional[List[str]]:
             # end of this rank block
             break
         # next rank header?
-        if re.search(r"\b(\d+)(st|nd|rd|th)\s+kyu\b", _fold(stripped)):
+        if _KYU_HEADER_RE.search(_fold(stripped)):
             break
         # Must start with 'Kamae:' exactly, not 'Weapon Kamae:'
         if stripped.startswith("Kamae:"):
@@ -212,7 +216,7 @@ def _answer_rank_kamae(question: str) -> Optional[str]:
     Handle questions like 'what are the kamae for 9th kyu?'
     """
     q = _fold(question)
-    m = re.search(r"(\d+)(st|nd|rd|th)\s+kyu", q)
+    m = _KYU_RE.search(q)
     if not m:
         return None
 
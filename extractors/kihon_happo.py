@@ -38,9 +38,12 @@ def _clean_item(s: str) -> str:
     return s
 
 
+_ITEM_SEP_RE = re.compile(r"[;,]")
+
+
 def _split_items(tail: str) -> List[str]:
     # Split on commas/semicolons; keep short/normal items; drop junk
-    parts = [p for p in re.split(r"[;,]", tail) if p.strip()]
+    parts = [p for p in _ITEM_SEP_RE.split(tail) if p.strip()]
     items = []
     for p in parts:
         p2 = _clean_item(p)
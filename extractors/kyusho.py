@@ -16,6 +16,10 @@ from typing import List, Dict, Any, Optional
 from .common import dedupe_preserve, join_oxford
 
 
+# Terms _looks_like_kyusho_question checks for (on the folded question).
+KYUSHO_TRIGGERS = ("kyusho", "pressure point", "pressure points")
+
+
 def _fold(s: str) -> str:
     """Case- and accent-insensitive fold."""
     if not s:
@@ -37,19 +41,14 @@ def _same_source_name(p_source: str, target_name: str) -> bool:
     return base_actual == base_target
 
 
-def _looks_like_kyusho_question(question: str) -> bool:
+def _looks_like_kyusho_question(q: str) -> bool:
     """
     Only treat this as a kyusho question when the user clearly references
-    kyusho / pressure points.
+    kyusho / pressure points. Takes the folded question (_fold).
 
     This avoids stealing technique questions like 'describe Oni Kudaki'.
     """
-    q = _fold(question)
-    return (
-        "kyusho" in q
-        or "pressure point" in q
-        or "pressure points" in q
-    )
+    return any(t in q for t in KYUSHO_TRIGGERS)
 
 
 def _load_full_kyusho_file() -> str:
@@ -71,25 +70,6 @@ def _load_full_kyusho_file() -> str:
     return ""
 
 
-def _gather_kyusho_text(passages: List[Dict[str, Any]]) -> str:
-    """
-    Concatenate KYUSHO-related passages *and* append the full file contents
-    if available.
-    """
-    buf: List[str] = []
-    for p in passages:
-        src_raw = p.get("source") or ""
-        src_fold = _fold(src_raw)
-        if _same_source_name(src_raw, "KYUSHO.txt") or "kyusho" in src_fold:
-            buf.append(p.get("text", ""))
-
-    full_file = _load_full_kyusho_file()
-    if full_file.strip():
-        buf.append(full_file)
-
-    return "\n".join(buf)
-
-
 def _parse_points(text: str) -> Dict[str, str]:
     """
     Very simple parser for KYUSHO.txt.
@@ -132,13 +112,44 @@ def _parse_points(text: str) -> Dict[str, str]:
     return points
 
 
-def _match_point_name(question: str, points: Dict[str, str]) -> Optional[str]:
+# Points parsed from the full KYUSHO.txt. The file only changes on redeploy, so
+# it is read and parsed once per process instead of on every kyusho question.
+_FILE_POINTS_CACHE: Optional[Dict[str, str]] = None
+
+
+def _file_points() -> Dict[str, str]:
+    global _FILE_POINTS_CACHE
+    if _FILE_POINTS_CACHE is None:
+        _FILE_POINTS_CACHE = _parse_points(_load_full_kyusho_file())
+    return _FILE_POINTS_CACHE
+
+
+def _gather_points(passages: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Points from KYUSHO-related passages, then any further points from the full
+    file. Same result as parsing the passages with the file appended: the first
+    occurrence of a name wins.
+    """
+    buf: List[str] = []
+    for p in passages:
+        src_raw = p.get("source") or ""
+        src_fold = _fold(src_raw)
+        if _same_source_name(src_raw, "KYUSHO.txt") or "kyusho" in src_fold:
+            buf.append(p.get("text", ""))
+
+    points = _parse_points("\n".join(buf))
+    for key, desc in _file_points().items():
+        points.setdefault(key, desc)
+    return points
+
+
+def _match_point_name(q: str, points: Dict[str, str]) -> Optional[str]:
     """
-    Return the folded key of the first kyusho name mentioned in the question.
+    Return the folded key of the first kyusho name mentioned in the folded
+    question `q`.
 
     Uses word-boundary regex so we don't mistakenly match 'in' from 'points'.
     """
-    q = _fold(question)
     for key in points.keys():
         if not key:
             continue
@@ -158,19 +169,14 @@ def try_answer_kyusho(question: str, passages: List[Dict[str, Any]]) -> Optional
         * 'Where is Ura Kimon kyusho?' style questions
         * 'List the kyusho pressure points' style questions
     """
-    if not _looks_like_kyusho_question(question):
-        return None
-
-    text = _gather_kyusho_text(passages)
-    if not text.strip():
+    q = _fold(question)  # folded once; the helpers below take it as-is
+    if not _looks_like_kyusho_question(q):
         return None
 
-    points = _parse_points(text)
+    points = _gather_points(passages)
     if not points:
         return None
 
-    q = _fold(question)
-
     # --- 1) List-style queries take precedence over single-point detection ---
     is_list = "list" in q or ("what" in q and "points" in q)
     if is_list:
@@ -185,7 +191,7 @@ def try_answer_kyusho(question: str, passages: List[Dict[str, Any]]) -> Optional
         return f"Kyusho points: {join_oxford(display_names)}"
 
     # --- 2) Specific point queries ---
-    key = _match_point_name(question, points)
+    key = _match_point_name(q, points)
     if key:
         desc = points.get(key, "").strip()
         name_display = " ".join(w.capitalize() for w in key.split())
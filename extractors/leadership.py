@@ -22,6 +22,9 @@ SCHOOL_ALIASES = {
     "kumogakure-ryu": ["kumogakure-ryu", "kumogakure ryu", "kumogakure-ryū", "kumogakure ryū"],
 }
 
+# Matched against the lowered, macron-stripped question.
+SOKE_TRIGGERS = ("soke", "soke'", "sōke", "grandmaster", "headmaster", "current head", "current grandmaster")
+
 QUALIFIERS = [
     # common style descriptors we should ignore when mapping to canonical school
     "koshijutsu", "kosshijutsu",
@@ -32,8 +35,13 @@ QUALIFIERS = [
     "ninpo taijutsu", "ninjutsu", "budo taijutsu", "budō taijutsu",
 ]
 
+_WS_RE = re.compile(r"\s+")
+_SCHOOL_RYU_RE = re.compile(r"\b([a-z' .]+?\sryu)\b")
+_WORD_RYU_RE = re.compile(r"\b([a-z]+)\s+ryu\b")
+_HAS_LETTER_RE = re.compile(r"[A-Za-z]")
+
 def _norm_ws(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _WS_RE.sub(" ", (s or "").strip())
 
 def _strip_macrons(s: str) -> str:
     return (s.replace("ō", "o")
@@ -67,7 +75,7 @@ def _just_school_ryu(s: str) -> str:
         s0 = s0.replace(q, "")
     s0 = _norm_ws(s0)
     # take up to "... ryu"
-    m = re.search(r"\b([a-z' .]+?\sryu)\b", s0)
+    m = _SCHOOL_RYU_RE.search(s0)
     if m:
         return m.group(1)
     # fallback: if it already contains 'ryu' keep left part
@@ -82,7 +90,7 @@ def _alias_to_key(name_like: str) -> Optional[str]:
             if _strip_macrons(a).lower() in core:
                 return key
     # loose guess: '<word> ryu'
-    m = re.search(r"\b([a-z]+)\s+ryu\b", core)
+    m = _WORD_RYU_RE.search(core)
     if m:
         guess = m.group(0)
         for key, aliases in SCHOOL_ALIASES.items():
@@ -117,7 +125,7 @@ def _harvest_pairs_from_text(text: str) -> List[tuple[str, str]]:
                 school_like = _norm_ws(cols[0])
                 person = _norm_ws(cols[1])
                 # skip obvious non-rows (e.g., separators or accidental pipes)
-                if not re.search(r"[A-Za-z]", school_like) or not re.search(r"[A-Za-z]", person):
+                if not _HAS_LETTER_RE.search(school_like) or not _HAS_LETTER_RE.search(person):
                     continue
                 pairs.append((school_like, person))
 
@@ -173,7 +181,7 @@ def try_extract_answer(question: str, passages: List[Dict[str, Any]]) -> Optiona
     """
     ql = _strip_macrons(question.lower())
 
-    if not any(t in ql for t in ["soke", "soke'", "sōke", "grandmaster", "headmaster", "current head", "current grandmaster"]):
+    if not any(t in ql for t in SOKE_TRIGGERS):
         return None
 
     # tolerate common typos
@@ -187,7 +195,7 @@ def try_extract_answer(question: str, passages: List[Dict[str, Any]]) -> Optiona
             break
     if not target:
         # last-ditch: extract "<word> ryu" and try mapping
-        m = re.search(r"\b([a-z]+)\s+ryu\b", ql)
+        m = _WORD_RYU_RE.search(ql)
         if m:
             target = _alias_to_key(m.group(0))
     if not target:
@@ -66,6 +66,11 @@ def _load_training_text() -> str:
 # ----------------- parse Nage Waza sections -----------------
 
 
+_DASH_RE = re.compile(r"[-–−]")
+_KYU_RE = re.compile(r"\b(\d+)(st|nd|rd|th)\s+kyu\b")
+_DAN_RE = re.compile(r"\b(\d+)(st|nd|rd|th)\s+dan\b")
+
+
 def _parse_nage_records() -> Dict[str, Dict[str, str]]:
     """
     Parse all Nage Waza sections from the NTTV training reference into:
@@ -101,7 +106,7 @@ def _parse_nage_records() -> Dict[str, Dict[str, str]]:
             in_nage = True
 
             # Extract descriptor after the first dash-like character, if present
-            parts = re.split(r"[-–−]", line, 1)
+            parts = _DASH_RE.split(line, 1)
             group_desc = parts[1].strip() if len(parts) == 2 else ""
             current_group = group_desc or "Nage Waza"
             continue
@@ -125,7 +130,7 @@ def _parse_nage_records() -> Dict[str, Dict[str, str]]:
             continue
 
         # Split "Name− Description" or "Name- Description" using dash-like chars
-        parts = re.split(r"[-–−]", body, 1)
+        parts = _DASH_RE.split(body, 1)
         if len(parts) == 2:
             name_part, desc_part = parts
             name = name_part.strip()
@@ -233,7 +238,7 @@ def try_answer_nage_waza(question: str, passages: List[Dict[str, Any]]) -> Optio
 
     # If the question is clearly rank-based, bail out and let rank.py handle it.
     q = _fold(question)
-    if re.search(r"\b(\d+)(st|nd|rd|th)\s+kyu\b", q) or re.search(r"\b(\d+)(st|nd|rd|th)\s+dan\b", q) or " rank" in q:
+    if _KYU_RE.search(q) or _DAN_RE.search(q) or " rank" in q:
         return None
 
     records = _parse_nage_records()
@@ -1,4 +1,5 @@
 from __future__ import annotations
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 import re
 import os
@@ -7,8 +8,10 @@ import os
 # Small, safe helpers (keep behavior stable)
 # ============================================================
 
+_WS_RX = re.compile(r"\s+")
+
 def _norm(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip()
+    return _WS_RX.sub(" ", (s or "")).strip()
 
 def _lc(s: str) -> str:
     return _norm(s).lower()
@@ -105,9 +108,16 @@ _RANK_HEADER_RE = re.compile(
     re.IGNORECASE | re.MULTILINE
 )
 
+_Q_KYU_RE = re.compile(r"\b(\d+)\s*(?:st|nd|rd|th)?\s*kyu\b")
+_BY_KYU_RE = re.compile(r"\bby\s+\d+(st|nd|rd|th)\s+kyu\b")
+_KYU_TITLE_RE = re.compile(r"(\d+)(st|nd|rd|th)\s+kyu", re.IGNORECASE)
+
+# Pure in the question string, and the router plus every rank-family extractor
+# ask for the same question in one dispatch: parse once, then hit the cache.
+@lru_cache(maxsize=256)
 def _rank_key_from_question(q: str) -> Optional[str]:
     ql = _lc(q)
-    m = re.search(r"\b(\d+)\s*(?:st|nd|rd|th)?\s*kyu\b", ql)
+    m = _Q_KYU_RE.search(ql)
     if m:
         n = m.group(1)
         if n == "1":
@@ -131,10 +141,18 @@ def _find_rank_text_from_passages(passages: List[Dict[str, Any]]) -> Optional[st
     # Fallback: any chunk that clearly looks like a rank document
     for p in passages:
         text = (p.get("text") or "")
-        if text and ("kyu" in text.lower() and "kamae" in text.lower()):
+        if not text:
+            continue
+        low = text.lower()  # chunks run to a few KB; lower once, test twice
+        if "kyu" in low and "kamae" in low:
             return text
     return None
 
+# Every rank-family extractor (striking, nage, jime, ...) cuts the same block
+# out of the same rank document for one question; cache on (text, rank) so the
+# document is scanned once. Passage texts are reused str objects, so the key's
+# hash is cached too.
+@lru_cache(maxsize=32)
 def _extract_rank_block(full_text: str, rank_key: str) -> Optional[str]:
     if not full_text or not rank_key:
         return None
@@ -147,6 +165,10 @@ def _extract_rank_block(full_text: str, rank_key: str) -> Optional[str]:
     end = next_m.start() if next_m else len(full_text)
     return full_text[start:end].strip()
 
+_SECTION_HDR_RE = re.compile(r"^[A-Za-z0-9].*?:\s*$", re.MULTILINE)
+_ITEM_SEP_RE = re.compile(r"[;,]")
+_NEWLINE_RE = re.compile(r"\r?\n")
+
 def _extract_section_lines(block: str, header_label: str) -> List[str]:
     """
     Get lines for a header like "Striking:".
@@ -172,7 +194,7 @@ def _extract_section_lines(block: str, header_label: str) -> List[str]:
 
     # Stop at next section header (line ending with ':') OR next rank header
     stop = len(tail)
-    next_section = re.search(r"^[A-Za-z0-9].*?:\s*$", tail, re.MULTILINE)
+    next_section = _SECTION_HDR_RE.search(tail)
     if next_section:
         stop = min(stop, next_section.start())
     next_rank = _RANK_HEADER_RE.search(tail)
@@ -191,7 +213,7 @@ def _extract_section_lines(block: str, header_label: str) -> List[str]:
 def _split_items(lines: List[str]) -> List[str]:
     items = []
     for ln in lines:
-        parts = [x.strip(" -•\t") for x in re.split(r"[;,]", ln) if x and len(x.strip()) > 1]
+        parts = [x.strip(" -•\t") for x in _ITEM_SEP_RE.split(ln) if x and len(x.strip()) > 1]
         items.extend(parts)
     return [i for i in (_norm(x) for x in items) if i]
 
@@ -218,7 +240,7 @@ def try_answer_rank_striking(question: str, passages: List[Dict[str, Any]]) -> O
         any(phrase in ql for phrase in [
             "need to know by", "up through", "up to", "all kicks for", "everything for", "study list"
         ]) or
-        re.search(r"\bby\s+\d+(st|nd|rd|th)\s+kyu\b", ql) is not None
+        _BY_KYU_RE.search(ql) is not None
     )
 
     rank_key = _rank_key_from_question(question)
@@ -273,7 +295,7 @@ def try_answer_rank_striking(question: str, passages: List[Dict[str, Any]]) -> O
 
     # Normalize capitalization for header (avoid “8Th”)
     def _title_rank(s: str) -> str:
-        m = re.match(r"(\d+)(st|nd|rd|th)\s+kyu", s, flags=re.I)
+        m = _KYU_TITLE_RE.match(s)
         if m:
             num, suf = m.group(1), m.group(2).lower()
             return f"{num}{suf} Kyu"
@@ -382,7 +404,7 @@ def try_answer_rank_requirements(question: str, passages: List[Dict[str, Any]])
             if content:
                 sections.append(f"{label} {content}")
 
-    header_line = re.split(r"\r?\n", block, maxsplit=1)[0].strip()
+    header_line = _NEWLINE_RE.split(block, maxsplit=1)[0].strip()
     add_section("Kamae:")
     add_section("Ukemi:")
     add_section("Kaiten:")
@@ -507,7 +529,7 @@ def try_answer_rank_ukemi(
     # Normalize capitalization for header (avoid “8Th”)
     def _title_rank(s: str) -> str:
         s = _norm(s)
-        m = re.match(r"(\d+)(st|nd|rd|th)\s+kyu", s, flags=re.IGNORECASE)
+        m = _KYU_TITLE_RE.match(s)
         if not m:
             return s
         num = m.group(1)
@@ -555,7 +577,7 @@ def try_answer_rank_taihenjutsu(
 
     def _title_rank(s: str) -> str:
         s = _norm(s)
-        m = re.match(r"(\d+)(st|nd|rd|th)\s+kyu", s, flags=re.IGNORECASE)
+        m = _KYU_TITLE_RE.match(s)
         if not m:
             return s
         num = m.group(1)
@@ -61,41 +61,45 @@ _ELEMENT_DATA: Dict[str, Dict[str, Any]] = {
     },
 }
 
+# Every term that can make _looks_like_sanshin_question true; the dispatcher
+# gates try_answer_sanshin on these.
+SANSHIN_TRIGGERS = ("sanshin", "san shin") + tuple(
+    alias for meta in _ELEMENT_DATA.values() for alias in meta["aliases"]
+)
+
 # ------------------------------------------------------------
 # Helpers
 # ------------------------------------------------------------
 
+_WS_RX = re.compile(r"\s+")
+
+
 def _norm(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip().lower()
+    return _WS_RX.sub(" ", (s or "")).strip().lower()
 
-def _looks_like_sanshin_question(question: str) -> bool:
-    q = _norm(question)
+# The question helpers below take the already-normalised question (_norm), so
+# try_answer_sanshin normalises once instead of once per check.
+
+def _looks_like_sanshin_question(q: str) -> bool:
     if "sanshin" in q or "san shin" in q:
         return True
     # element-specific without the word 'sanshin'
-    for meta in _ELEMENT_DATA.values():
-        for alias in meta["aliases"]:
-            if alias in q:
-                return True
-    return False
+    return _detect_element(q) is not None
 
-def _detect_element(question: str) -> Optional[Dict[str, Any]]:
-    q = _norm(question)
+def _detect_element(q: str) -> Optional[Dict[str, Any]]:
     for meta in _ELEMENT_DATA.values():
         for alias in meta["aliases"]:
             if alias in q:
                 return meta
     return None
 
-def _wants_list(question: str) -> bool:
-    q = _norm(question)
+def _wants_list(q: str) -> bool:
     return (
         ("what are" in q or "list" in q or "which" in q or "name the" in q)
         and ("sanshin" in q or "san shin" in q or "five elements" in q or "5 elements" in q)
     )
 
-def _wants_overview(question: str) -> bool:
-    q = _norm(question)
+def _wants_overview(q: str) -> bool:
     if "what is" in q or "explain" in q or "describe" in q:
         if "sanshin" in q or "san shin" in q:
             return True
@@ -143,11 +147,12 @@ def try_answer_sanshin(question: str, passages: List[Dict[str, Any]]) -> Optiona
       * 'what is Chi no Kata?'
       * 'describe Sui no Kata', etc.
     """
-    if not _looks_like_sanshin_question(question):
+    q = _norm(question)
+    if not _looks_like_sanshin_question(q):
         return None
 
     # Element-specific questions
-    elem = _detect_element(question)
+    elem = _detect_element(q)
     if elem is not None:
         name = elem["name"]
         eng = elem["english"]
@@ -155,7 +160,7 @@ def try_answer_sanshin(question: str, passages: List[Dict[str, Any]]) -> Optiona
         return f"{name} ({eng}): {summary}"
 
     # List-style questions about the elements
-    if _wants_list(question):
+    if _wants_list(q):
         ordered = [meta["name"] for meta in _ELEMENT_DATA.values()]
         ordered = dedupe_preserve(ordered)
         if len(ordered) >= 3:
@@ -166,7 +171,7 @@ def try_answer_sanshin(question: str, passages: List[Dict[str, Any]]) -> Optiona
             )
 
     # Overview of Sanshin no Kata
-    if _wants_overview(question):
+    if _wants_overview(q):
         names = [meta["name"] for meta in _ELEMENT_DATA.values()]
         names = dedupe_preserve(names)
         elements_list = join_oxford(names)
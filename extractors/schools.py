@@ -51,13 +51,31 @@ _MACRON_MAP = str.maketrans({
     "’": "'", "“": '"', "”": '"',
 })
 
+_WS_RE = re.compile(r"\s+")
+_RYU_GUESS_RE = re.compile(r"([a-z0-9\- ]+)\s+ryu\b")
+_FIELD_RE = re.compile(r"^\s*([A-Za-z][A-Za-z ]{1,20}):\s*(.*)$")
+_TRANSLATION_RE = re.compile(r'translation[: ]+["“](.+?)["”]', re.IGNORECASE)
+
 def _norm(s: str) -> str:
     s = (s or "").translate(_MACRON_MAP)
     s = s.replace("\u2010", "-").replace("\u2011", "-").replace("\u2013", "-").replace("\u2014", "-")
     s = s.replace("–", "-").replace("—", "-")
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     return s.strip().lower()
 
+# Alias tables precomputed once at import (queries/headers are scanned against
+# these on every call).
+_NORM_ALIASES: Dict[str, Tuple[str, ...]] = {
+    canon: tuple(_norm(t) for t in [canon] + aliases) for canon, aliases in SCHOOL_ALIASES.items()
+}
+_NORM_CANON: Dict[str, str] = {canon: _norm(canon) for canon in SCHOOL_ALIASES}
+
+# Flat, lowercased (not macron-folded) canon + alias terms, deduped, for callers
+# that match on plain question.lower().
+SCHOOL_TERMS: Tuple[str, ...] = tuple(dict.fromkeys(
+    t.lower() for canon, aliases in SCHOOL_ALIASES.items() for t in [canon] + aliases
+))
+
 def _same_source_name(p_source: str, target_name: str) -> bool:
     """
     Compare FAISS/meta 'source' values (which may include paths) with the
@@ -81,33 +99,36 @@ def _looks_like_school_header(line: str) -> bool:
 
 def _canon_for_query(question: str) -> Optional[str]:
     qn = _norm(question)
-    for canon, aliases in SCHOOL_ALIASES.items():
-        tokens = [_norm(canon)] + [_norm(a) for a in aliases]
+    for canon, tokens in _NORM_ALIASES.items():
         if any(tok in qn for tok in tokens):
             return canon
-    m = re.search(r"([a-z0-9\- ]+)\s+ryu\b", qn)
+    m = _RYU_GUESS_RE.search(qn)
     if m:
         guess = m.group(1).strip().replace("-", " ")
-        for canon in SCHOOL_ALIASES.keys():
-            if _norm(canon).startswith(guess):
+        for canon, canon_n in _NORM_CANON.items():
+            if canon_n.startswith(guess):
                 return canon
     return None
 
 # ----------------------------
 # List-intent detection (EXPORTED)
 # ----------------------------
+_LIST_TRIGGERS: Tuple[str, ...] = (
+    "what are the schools of the bujinkan",
+    "list the schools of the bujinkan",
+    "nine schools of the bujinkan",
+    "what are the nine schools",
+    "list the nine schools",
+    "what schools are in the bujinkan",
+    "which schools are in the bujinkan",
+)
+
 def is_school_list_query(question: str) -> bool:
     q = _norm(question)
-    triggers = [
-        "what are the schools of the bujinkan",
-        "list the schools of the bujinkan",
-        "nine schools of the bujinkan",
-        "what are the nine schools",
-        "list the nine schools",
-        "what schools are in the bujinkan",
-        "which schools are in the bujinkan",
-    ]
-    return any(t in q for t in triggers)
+    # every trigger contains "schools": one scan rules out most questions
+    if "schools" not in q:
+        return False
+    return any(t in q for t in _LIST_TRIGGERS)
 
 # ----------------------------
 # Slicing & field extraction
@@ -138,7 +159,7 @@ def _parse_fields(block_lines: List[str]) -> Dict[str, str]:
     for ln in block_lines:
         if not ln.strip():
             continue
-        m = re.match(r"^\s*([A-Za-z][A-Za-z ]{1,20}):\s*(.*)$", ln)
+        m = _FIELD_RE.match(ln)
         if m:
             key = _norm(m.group(1))
             val = m.group(2).strip()
@@ -203,7 +224,7 @@ def _fallback_block_by_alias(blob: str, canon: str) -> Optional[List[str]]:
         return None
     lines = blob.splitlines()
     norm_lines = [_norm(ln) for ln in lines]
-    aliases = [_norm(canon)] + [_norm(a) for a in SCHOOL_ALIASES.get(canon, [])]
+    aliases = _NORM_ALIASES.get(canon) or (_norm(canon),)
     hit_idx = None
     for i, ln in enumerate(norm_lines):
         if any(tok in ln for tok in aliases):
@@ -235,7 +256,7 @@ def _infer_fields_from_freeblock(free_lines: List[str]) -> Dict[str, str]:
         inferred["type"] = "Samurai"
 
     # Translation inference
-    m = re.search(r'translation[: ]+["“](.+?)["”]', txt, flags=re.IGNORECASE)
+    m = _TRANSLATION_RE.search(txt)
     if m:
         inferred["translation"] = m.group(1).strip()
 
@@ -262,15 +283,14 @@ def _infer_fields_from_freeblock(free_lines: List[str]) -> Dict[str, str]:
 
 def _canon_from_header(header_line: str) -> Optional[str]:
     h = _norm(header_line)
-    for canon, aliases in SCHOOL_ALIASES.items():
-        tokens = [_norm(canon)] + [_norm(a) for a in aliases]
+    for canon, tokens in _NORM_ALIASES.items():
         if any(tok in h for tok in tokens):
             return canon
-    m = re.search(r"([a-z0-9\- ]+)\s+ryu\b", h)
+    m = _RYU_GUESS_RE.search(h)
     if m:
         guess = m.group(1).strip().replace("-", " ")
-        for canon in SCHOOL_ALIASES.keys():
-            if _norm(canon).startswith(guess):
+        for canon, canon_n in _NORM_CANON.items():
+            if canon_n.startswith(guess):
                 return canon
     return None
 
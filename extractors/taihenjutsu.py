@@ -19,8 +19,11 @@ def _fold(s: str) -> str:
     return s.lower()
 
 
+_WS_RE = re.compile(r"\s+")
+
+
 def _norm_space(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "")).strip()
+    return _WS_RE.sub(" ", (s or "")).strip()
 
 
 def _looks_like_taihen_question(question: str) -> bool:
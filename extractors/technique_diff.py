@@ -117,12 +117,24 @@ def _resolve_technique_name(
     return None
 
 
+DIFF_MARKERS = ("difference between", "different from", "diff between", " vs ", "versus", "compare ")
+
+
 def _looks_like_diff_question(question: str) -> bool:
     q = question.lower()
-    return any(
-        tok in q
-        for tok in ["difference between", "different from", "diff between", " vs ", "versus", "compare "]
-    )
+    return any(tok in q for tok in DIFF_MARKERS)
+
+
+# Tried in order by _extract_pair.
+_PAIR_PATTERNS = (
+    # 1) "difference between A and B"
+    re.compile(r"difference between\s+(.+?)\s+and\s+(.+)", re.IGNORECASE),
+    # 2) "compare A and B"
+    re.compile(r"compare\s+(.+?)\s+and\s+(.+)", re.IGNORECASE),
+    # 3) "A vs B" / "A versus B"
+    re.compile(r"(.+?)\s+vs\.?\s+(.+)", re.IGNORECASE),
+    re.compile(r"(.+?)\s+versus\s+(.+)", re.IGNORECASE),
+)
 
 
 def _extract_pair(question: str) -> Optional[tuple[str, str]]:
@@ -134,25 +146,10 @@ def _extract_pair(question: str) -> Optional[tuple[str, str]]:
     """
     q = question.strip().rstrip("?.! ")
 
-    # 1) "difference between A and B"
-    m = re.search(r"difference between\s+(.+?)\s+and\s+(.+)", q, flags=re.IGNORECASE)
-    if m:
-        return m.group(1).strip(), m.group(2).strip()
-
-    # 2) "compare A and B"
-    m = re.search(r"compare\s+(.+?)\s+and\s+(.+)", q, flags=re.IGNORECASE)
-    if m:
-        return m.group(1).strip(), m.group(2).strip()
-
-    # 3) "A vs B" / "A versus B"
-    m = re.search(r"(.+?)\s+vs\.?\s+(.+)", q, flags=re.IGNORECASE)
-    if m:
-        return m.group(1).strip(), m.group(2).strip()
-
-    m = re.search(r"(.+?)\s+versus\s+(.+)", q, flags=re.IGNORECASE)
-    if m:
-        return m.group(1).strip(), m.group(2).strip()
-
+    for rx in _PAIR_PATTERNS:
+        m = rx.search(q)
+        if m:
+            return m.group(1).strip(), m.group(2).strip()
     return None
 
 
@@ -16,8 +16,12 @@ FIELDS_CANON = [
 BOOL_TRUE = {"1", "true", "yes", "y", "✅", "✓", "✔"}
 BOOL_FALSE = {"0", "false", "no", "n", "❌", "✗", "✕"}
 
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_TAG_SEP_RE = re.compile(r"[|,]")
+
 def _norm(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _WS_RE.sub(" ", (s or "").strip())
 
 def _fold(s: str) -> str:
     # Unicode fold: strip macrons/accents and lowercase
@@ -30,7 +34,7 @@ def _fold(s: str) -> str:
 def _keylite(s: str) -> str:
     # Aggressive key: folded, alnum-only
     s = _fold(s)
-    return re.sub(r"[^a-z0-9]+", "", s)
+    return _NON_ALNUM_RE.sub("", s)
 
 def _to_bool(s: str) -> Optional[bool]:
     if s is None:
@@ -45,7 +49,7 @@ def _to_bool(s: str) -> Optional[bool]:
 def _split_tags(s: str) -> List[str]:
     if not s:
         return []
-    parts = re.split(r"[|,]", s)
+    parts = _TAG_SEP_RE.split(s)
     return [t.strip() for t in parts if t.strip()]
 
 def _canon_header(h: str) -> str:
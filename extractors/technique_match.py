@@ -6,14 +6,18 @@ import unicodedata
 
 from .technique_aliases import TECH_ALIASES, expand_with_aliases
 
+_PUNCT_RE = re.compile(r"[^a-z0-9\s\-']")
+_WS_RE = re.compile(r"\s+")
+_NO_KATA_RE = re.compile(r"\bno kata\b")
+
 def fold(s: str) -> str:
     if not s:
         return ""
     s = unicodedata.normalize("NFKD", s)
     s = "".join(ch for ch in s if not unicodedata.combining(ch))
     s = s.replace("–", "-").replace("—", "-")
-    s = re.sub(r"[^a-z0-9\s\-']", " ", s.lower())
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _PUNCT_RE.sub(" ", s.lower())
+    s = _WS_RE.sub(" ", s).strip()
     return s
 
 def technique_name_variants(name: str) -> List[str]:
@@ -21,7 +25,7 @@ def technique_name_variants(name: str) -> List[str]:
     base = fold(name)
     variants = {base}
     # strip ' no kata'
-    variants.add(re.sub(r"\bno kata\b", "", base).strip())
+    variants.add(_NO_KATA_RE.sub("", base).strip())
     # collapse spaces/hyphens
     variants.add(base.replace(" - ", " ").replace("-", " "))
     return [v for v in variants if v]
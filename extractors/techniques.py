@@ -29,8 +29,13 @@ EXPECTED_COLS = 12  # name, japanese, translation, type, rank, in_rank, primary_
 
 # ------------------------- utilities -------------------------
 
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_ASK_TAIL_RE = re.compile(r"(?:what\s+is|define|explain|describe)\s+(.+)$", re.I)
+_FILLER_RE = re.compile(r"\b(technique|in ninjutsu|in bujinkan)\b", re.I)
+
 def _norm_space(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _WS_RE.sub(" ", (s or "").strip())
 
 def _fold(s: str) -> str:
     """Lowercase + strip macrons/diacritics."""
@@ -42,7 +47,7 @@ def _fold(s: str) -> str:
 
 def _lite(s: str) -> str:
     """Alnum only for tolerant matching."""
-    return re.sub(r"[^a-z0-9]+", "", _fold(s))
+    return _NON_ALNUM_RE.sub("", _fold(s))
 
 def _same_source_name(p_source: str, target_name: str) -> bool:
     """
@@ -83,18 +88,9 @@ def _extract_candidate(ql: str) -> str:
     This keeps the candidate clean so 'describe Oni Kudaki' becomes just
     'Oni Kudaki' for matching against Technique Descriptions.
     """
-    m = re.search(
-        r"(?:what\s+is|define|explain|describe)\s+(.+)$",
-        ql,
-        flags=re.I,
-    )
+    m = _ASK_TAIL_RE.search(ql)
     cand = (m.group(1) if m else ql).strip().rstrip("?!.")
-    cand = re.sub(
-        r"\b(technique|in ninjutsu|in bujinkan)\b",
-        "",
-        cand,
-        flags=re.I,
-    ).strip()
+    cand = _FILLER_RE.sub("", cand).strip()
     return cand
 
 def _candidate_variants(raw: str) -> List[str]:
@@ -96,6 +96,9 @@ def _join_passages_text(passages: List[Dict[str, Any]], source_name: str) -> str
     return "\n".join(chunks)
 
 
+_WEAPON_SPLIT_RE = re.compile(r"(?m)^(?=\[WEAPON\] )")
+
+
 def _parse_weapon_blocks(passages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
     """
     Parse [WEAPON] blocks from NTTV Weapons Reference text into dictionaries.
@@ -118,7 +121,7 @@ def _parse_weapon_blocks(passages: List[Dict[str, Any]]) -> List[Dict[str, str]]
 
     rows: List[Dict[str, str]] = []
     # Split on new weapon headers
-    blocks = re.split(r"(?m)^(?=\[WEAPON\] )", text)
+    blocks = _WEAPON_SPLIT_RE.split(text)
     for block in blocks:
         block = block.strip()
         if not block or not block.startswith("[WEAPON]"):
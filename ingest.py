@@ -219,7 +219,7 @@ def main() -> None:
 
     print(f"Saving metadata to {META_PATH}")
     with META_PATH.open("wb") as f:
-        pickle.dump(all_chunks, f)
+        pickle.dump(all_chunks, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     # Config is read by app.py; keep old keys for backwards-compat
     config = {
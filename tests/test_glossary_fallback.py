@@ -80,3 +80,14 @@ def test_glossary_backs_off_for_short_technique_name():
     ans = try_answer_glossary(q, _gloss_and_tech_passages())
 
     assert not ans
+
+
+def test_glossary_prefers_entries_from_retrieved_chunks():
+    # "zenpo" only matches by substring. With no chunks the file order picks an
+    # earlier entry; a retrieved chunk's entries come first. The chunk is cut
+    # mid-definition, so the file's full definition is used.
+    q = "What is zenpo?"
+    assert "zenpo tobi" not in (try_answer_glossary(q, []) or "").lower()
+
+    chunk = [{"text": "Zenpo Tobi - Forward", "source": "Glossary - edit.txt"}]
+    assert try_answer_glossary(q, chunk) == "Zenpo Tobi: Forward Leap"
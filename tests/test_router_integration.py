@@ -339,3 +339,82 @@ def test_router_diff_omote_vs_ura_gyaku():
     assert "translation:" in low
     assert "type:" in low
     assert "description:" in low
+
+
+def test_rank_gated_extractors_need_a_rank_in_the_question():
+    """
+    The dispatcher skips rank-flagged extractors when the question names no
+    rank; that is only safe while each of them returns None in that case.
+    """
+    from extractors import _EXTRACTOR_CHAIN, I_RANK
+
+    passages = _passages_rank_and_gloss()
+    for q in [
+        "What kicks are in the curriculum?",
+        "Which throws and chokes do we study?",
+        "What ukemi and taihenjutsu are required?",
+        "What Kihon Happo and Sanshin kata are on the requirements list?",
+    ]:
+        for need, extractor in _EXTRACTOR_CHAIN:
+            if need & I_RANK:
+                assert extractor(q, passages) is None, (extractor.__name__, q)
+
+
+def test_keyword_gated_extractors_need_their_trigger():
+    """
+    Intent bits let the dispatcher skip an extractor outright; that is only
+    safe while the extractor itself returns None whenever its bits are unset.
+    """
+    from extractors import _EXTRACTOR_CHAIN, _intent_mask
+
+    passages = _passages_tech_and_gloss() + _passages_weapons_and_gloss()
+    for q in [
+        "What are the parts of the sword?",
+        "Explain Omote Gyaku and Ura Gyaku",
+        "What are the eight techniques?",
+        "Who leads the Gyokko Ryu?",
+        "Where is the point under the nose?",
+        "Explain the earth  element",
+    ]:
+        mask = _intent_mask(q)
+        for need, extractor in _EXTRACTOR_CHAIN:
+            if need & mask != need:
+                assert extractor(q, passages) is None, (extractor.__name__, q)
+
+
+def test_dispatch_cache_is_keyed_on_passages_too():
+    from extractors import _DISPATCH_CACHE
+
+    q = "What kicks do I need to know for 8th kyu?"
+    first = try_extract_answer(q, _passages_rank_and_gloss())
+    assert try_extract_answer(q, _passages_rank_and_gloss()) == first
+    assert any(k[0] == q for k in _DISPATCH_CACHE)
+
+    # Same question, different passages: must not be served from the memo.
+    assert try_extract_answer(q, []) != first
+
+
+def test_fused_intent_scan_finds_every_keyword_group():
+    """One finditer must set the same bits as testing each group on its own."""
+    from itertools import permutations
+
+    from extractors import _KEYWORD_INTENTS, _intent_mask
+
+    terms = [(bit, t) for _name, bit, group in _KEYWORD_INTENTS for t in group]
+    for (bit_a, a), (bit_b, b) in permutations(terms, 2):
+        qs = [f"{a}{b}", f"tell me {a} and {b}?"]
+        # Terms sharing letters: "a" ending where "b" begins.
+        qs += [a + b[k:] for k in range(1, min(len(a), len(b))) if a[-k:] == b[:k]]
+        for q in qs:
+            assert _intent_mask(q) & (bit_a | bit_b) == bit_a | bit_b, q
+
+
+def test_warm_extractor_caches_fills_tables_without_a_dispatch():
+    from extractors import _DISPATCH_CACHE, clear_dispatch_cache, warm_extractor_caches
+    from extractors import glossary, kyusho
+
+    clear_dispatch_cache()
+    warm_extractor_caches()
+    assert not _DISPATCH_CACHE
+    assert kyusho._FILE_POINTS_CACHE is not None
+    assert glossary._key_indexes.cache_info().currsize